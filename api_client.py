@@ -0,0 +1,205 @@
+# api_client.py - Clients the frontend uses to talk to the backend API
+#
+# HttpClient calls the backend over HTTP and is the default, for deployments
+# where frontend and backend run separately. EmbeddedClient is for
+# single-host deployments: it calls the backend's data-access functions
+# in-process for the reads every page render needs, and dispatches
+# everything else to the backend app in-process, skipping the HTTP hop,
+# JSON round trip and second WSGI server.
+#
+# Both clients identify the user the same way: the backend session cookie
+# set by /api/login is kept in the frontend session under API_SESSION_KEY
+# and sent with every later call, and the backend authorizes from that
+# session in both modes.
+
+import re
+from http.cookiejar import DefaultCookiePolicy
+from http.cookies import SimpleCookie
+
+import requests
+from flask import has_request_context, request, session
+
+API_SESSION_KEY = 'api_session'
+
+class ApiResponse:
+    __slots__ = ('status_code', '_data')
+
+    def __init__(self, status_code, data):
+        self.status_code = status_code
+        self._data = data
+
+    def json(self):
+        return self._data
+
+# A streamed response: iterate it for the body chunks as they arrive, and
+# close it when done so the backend can drop its side of the stream
+class ApiStream:
+    __slots__ = ('status_code', '_chunks', '_close')
+
+    def __init__(self, status_code, chunks, close):
+        self.status_code = status_code
+        self._chunks = chunks
+        self._close = close
+
+    def __iter__(self):
+        return iter(self._chunks)
+
+    def close(self):
+        self._close()
+
+class HttpClient:
+    def __init__(self, base_url, session_cookie='session'):
+        self.base_url = base_url
+        self.session_cookie = session_cookie
+        # Reuse connections to the backend across requests. The session is
+        # shared by every frontend user, so it must never keep cookies; each
+        # call carries the current user's backend session explicitly.
+        self.session = requests.Session()
+        self.session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        # Compressing responses over the local hop only costs CPU on both ends
+        self.session.headers['Accept-Encoding'] = 'identity'
+
+    def get(self, path, headers=None, **kwargs):
+        return self._send('GET', path, headers, **kwargs)
+
+    def post(self, path, headers=None, **kwargs):
+        return self._send('POST', path, headers, **kwargs)
+
+    def stream(self, path, headers=None):
+        response = self.session.get(f'{self.base_url}{path}', headers=_outgoing_headers(headers, self.session_cookie),
+                                    stream=True)
+        return ApiStream(response.status_code, response.iter_content(chunk_size=None), response.close)
+
+    def _send(self, method, path, headers, **kwargs):
+        response = self.session.request(method, f'{self.base_url}{path}',
+                                        headers=_outgoing_headers(headers, self.session_cookie), **kwargs)
+        _remember_backend_session(response.cookies.get(self.session_cookie))
+        return response
+
+class EmbeddedClient:
+    def __init__(self):
+        import app as backend
+        self.backend = backend
+        self.session_cookie = backend.app.config['SESSION_COOKIE_NAME']
+        self._sessions = backend.app.session_interface.get_signing_serializer(backend.app)
+        self._max_age = int(backend.app.permanent_session_lifetime.total_seconds())
+        self._client = backend.app.test_client(use_cookies=False)
+        # Direct reads, with the backend endpoint whose rate limit they share
+        # and whether they need a DB admission slot of their own (coalesced
+        # reads take one inside their shared load instead)
+        self._routes = [
+            (re.compile(r'^/jobs$'), 'get_jobs', False, self._jobs),
+            (re.compile(r'^/jobs/company/(?P<company_id>\d+)$'), 'get_company_jobs', True, self._company_jobs),
+            (re.compile(r'^/profile/(?P<user_type>seeker|employer)/(?P<user_id>\d+)$'), 'get_profile', False,
+             self._profile),
+            (re.compile(r'^/applications/seeker/(?P<profile_id>\d+)$'), 'get_seeker_applications', True,
+             self._seeker_applications),
+        ]
+
+    def get(self, path, headers=None, **kwargs):
+        for pattern, endpoint, admit, handler in self._routes:
+            match = pattern.match(path)
+            if match:
+                return self._call(endpoint, admit, handler, match.groupdict())
+        return self._dispatch('GET', path, headers, **kwargs)
+
+    def post(self, path, headers=None, **kwargs):
+        return self._dispatch('POST', path, headers, **kwargs)
+
+    def stream(self, path, headers=None):
+        response = self._client.open(f'/api{path}', headers=_outgoing_headers(headers, self.session_cookie),
+                                     environ_base={'REMOTE_ADDR': _client_address() or '127.0.0.1'}, buffered=False)
+        return ApiStream(response.status_code, response.response, response.close)
+
+    # Direct calls go through the same session checks, rate limits and DB
+    # admission as the backend's own routes
+    def _call(self, endpoint, admit, handler, params):
+        viewer = self._backend_session()
+        address = None
+        if has_request_context():
+            address = self.backend.resolve_client_address(request.remote_addr,
+                                                           request.headers.get('X-Forwarded-For'))
+        retry_after = self.backend.rate_limiter.check(endpoint, viewer.get('user_id') or address)
+        if retry_after:
+            return ApiResponse(429, {'error': 'Too many requests'})
+        try:
+            if admit:
+                with self.backend.db_admission:
+                    return handler(viewer, **params)
+            return handler(viewer, **params)
+        except self.backend.Overloaded:
+            return ApiResponse(503, {'error': 'Server is busy, please retry shortly'})
+        except self.backend.mysql.connector.Error as err:
+            return ApiResponse(500, {'error': f'Database error: {str(err)}'})
+
+    def _dispatch(self, method, path, headers, **kwargs):
+        response = self._client.open(f'/api{path}', method=method,
+                                     headers=_outgoing_headers(headers, self.session_cookie),
+                                     environ_base={'REMOTE_ADDR': _client_address() or '127.0.0.1'}, **kwargs)
+        cookies = SimpleCookie()
+        for header in response.headers.getlist('Set-Cookie'):
+            cookies.load(header)
+        if self.session_cookie in cookies:
+            _remember_backend_session(cookies[self.session_cookie].value)
+        return ApiResponse(response.status_code, response.get_json())
+
+    # The backend session the current frontend user carries, decoded the same
+    # way the backend app would
+    def _backend_session(self):
+        token = session.get(API_SESSION_KEY) if has_request_context() else None
+        if not token:
+            return {}
+        try:
+            return self._sessions.loads(token, max_age=self._max_age)
+        except Exception:
+            return {}
+
+    def _jobs(self, viewer):
+        jobs, _, _ = self.backend.read_coalescer.do(('jobs', False), lambda: self.backend.load_jobs_response(False))
+        return ApiResponse(200, jobs)
+
+    def _profile(self, viewer, user_type, user_id):
+        user_id = int(user_id)
+        profile, _ = self.backend.read_coalescer.do(('profile', user_type, user_id),
+                                                    lambda: self.backend.load_profile_response(user_type, user_id))
+        if profile is None:
+            return ApiResponse(404, {'error': 'Profile not found'})
+        return ApiResponse(200, profile)
+
+    def _company_jobs(self, viewer, company_id):
+        if not viewer.get('user_id') or viewer.get('user_type') != 'employer':
+            return ApiResponse(403, {'error': 'Unauthorized access'})
+        jobs = self.backend.query_company_jobs(int(company_id), viewer['user_id'])
+        if jobs is None:
+            return ApiResponse(403, {'error': 'You don\'t have access to this company'})
+        return ApiResponse(200, jobs)
+
+    def _seeker_applications(self, viewer, profile_id):
+        if not viewer.get('user_id') or viewer.get('user_type') != 'seeker':
+            return ApiResponse(403, {'error': 'Unauthorized access'})
+        applications = self.backend.query_seeker_applications(int(profile_id), viewer['user_id'])
+        if applications is None:
+            return ApiResponse(403, {'error': 'You don\'t have access to this profile'})
+        return ApiResponse(200, applications)
+
+# Address of the end user the frontend is currently serving
+def _client_address():
+    return request.remote_addr if has_request_context() else None
+
+# Headers for a backend call: the forwarding chain so far with the address we
+# received the request from appended, so the backend rate limits the end user
+# rather than us (or a proxy in front of us), and their backend session
+def _outgoing_headers(headers, session_cookie):
+    headers = dict(headers or {})
+    address = _client_address()
+    if address:
+        forwarded = request.headers.get('X-Forwarded-For')
+        headers['X-Forwarded-For'] = f'{forwarded}, {address}' if forwarded else address
+    token = session.get(API_SESSION_KEY) if has_request_context() else None
+    if token:
+        headers['Cookie'] = f'{session_cookie}={token}'
+    return headers
+
+def _remember_backend_session(token):
+    if token and has_request_context():
+        session[API_SESSION_KEY] = token
@@ -1,16 +1,88 @@
 # app.py - Flask Backend for Job Portal
 
-from flask import Flask, request, jsonify, session
+from flask import Flask, Response, request, jsonify, session, g
 from flask_cors import CORS
 import mysql.connector
 import os
 from werkzeug.security import generate_password_hash, check_password_hash
 import json
+import csv
+import io
+import hashlib
+import heapq
 from datetime import datetime
+from tasks import TaskQueue, SQLiteBackend
+from coalesce import SingleFlight
+import http_cache
+from ratelimit import RateLimiter, RedisStore, Admission, Overloaded
+from pubsub import Broker
 
 app = Flask(__name__)
 app.secret_key = 'your_secret_key'
 CORS(app)
+# Responses that depend on the session must not be stored by shared caches
+compressed_responses = http_cache.init_app(app, private={'get_profile', 'get_employer_applications',
+                                                 'get_seeker_applications', 'get_company_jobs'})
+
+# Background task queue for post-commit side effects. Set TASK_QUEUE_DB to a
+# file path to keep pending tasks across restarts.
+task_queue = TaskQueue(
+    backend=SQLiteBackend(os.environ['TASK_QUEUE_DB']) if os.environ.get('TASK_QUEUE_DB') else None,
+    workers=int(os.environ.get('TASK_QUEUE_WORKERS', 4))
+)
+
+# Hot public reads (job listings, profiles) are coalesced: concurrent identical
+# requests share one query, and results are reused for a couple of seconds
+read_coalescer = SingleFlight(ttl=2.0, stale_ttl=30.0)
+
+# Token bucket limits per route and client, as (requests per second, burst).
+# Set RATE_LIMIT_REDIS_URL to share buckets between processes.
+RATE_LIMITS = {
+    'login': (1, 5),
+    'register': (0.2, 5),
+    'create_job': (0.5, 10),
+    'apply_for_job': (1, 10),
+    'get_jobs': (10, 30),
+    'export_employer_applications': (0.1, 2)
+}
+rate_limiter = RateLimiter(
+    store=RedisStore(os.environ['RATE_LIMIT_REDIS_URL']) if os.environ.get('RATE_LIMIT_REDIS_URL') else None,
+    rules=RATE_LIMITS
+)
+
+# Caps concurrent DB work so overload is shed with a 503 instead of
+# exhausting MySQL connections
+db_admission = Admission(
+    max_concurrent=int(os.environ.get('DB_MAX_CONCURRENT', 20)),
+    max_queue=int(os.environ.get('DB_MAX_QUEUE', 50)),
+    timeout=float(os.environ.get('DB_QUEUE_TIMEOUT', 2.0))
+)
+# Routes that don't need a slot for the whole request: the stream and
+# metrics don't touch the DB, and coalesced reads take a slot only while
+# their shared load is running
+ADMISSION_EXEMPT = {'static', 'stream_my_applications', 'get_metrics', 'get_jobs', 'get_profile'}
+
+# The frontend (and any reverse proxy in front of it) forwards the end user's
+# address in X-Forwarded-For; only trust hops from these addresses
+TRUSTED_PROXIES = set(os.environ.get('TRUSTED_PROXIES', '127.0.0.1,::1').split(','))
+
+# Application status changes, keyed by the seeker's user_id
+application_events = Broker()
+STREAM_KEEPALIVE = 15  # seconds between keepalive comments on idle streams
+
+APPLICATION_STATUSES = ('applied', 'under_review', 'rejected', 'shortlisted', 'selected')
+
+# Listings only read the hot tables by default; ?history=1 also reads the rows
+# archive.py has moved into the archive tables
+OPEN_JOB_CONDITION = 'j.closed_at IS NULL AND (j.expires_at IS NULL OR j.expires_at > NOW())'
+ALL_JOBS = '(SELECT * FROM jobs UNION ALL SELECT * FROM jobs_archive)'
+ALL_APPLICATIONS = '(SELECT * FROM applications UNION ALL SELECT * FROM applications_archive)'
+
+# Applicant exports are read in pages of this many rows, so memory stays
+# constant and a DB connection is only held while a page is being read
+EXPORT_PAGE_SIZE = 1000
+EXPORT_COLUMNS = ('application_id', 'job_id', 'job_title', 'job_type', 'profile_id', 'applicant_name',
+                  'status', 'application_date', 'skills', 'experience', 'education', 'cover_letter')
 
 # Database connection function
 def get_db_connection():
@@ -36,6 +108,130 @@ def format_result(cursor):
     
     return results
 
+# Accepts 'YYYY-MM-DD' or 'YYYY-MM-DD HH:MM:SS'; returns None for anything else
+def parse_timestamp(value):
+    if not isinstance(value, str):
+        return None
+    for fmt in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            pass
+    return None
+
+# Tables backing the application listings, including the archive for
+# ?history=1 requests
+def application_sources(include_history):
+    if include_history:
+        return {'applications': ALL_APPLICATIONS, 'jobs': ALL_JOBS}
+    return {'applications': 'applications', 'jobs': 'jobs'}
+
+# Enqueue a side effect of a write that has already committed. A failure here
+# must not turn the successful write into an error response, or clients would
+# retry it and hit duplicate errors.
+def enqueue_after_commit(name, payload):
+    try:
+        task_queue.enqueue(name, payload)
+    except Exception:
+        app.logger.exception('Failed to enqueue %s task', name)
+
+# Start the task workers in the process that serves requests, so tasks kept
+# in TASK_QUEUE_DB by an earlier run are resumed without waiting for a new
+# enqueue. This is a no-op once they are running.
+@app.before_request
+def start_task_workers():
+    task_queue.start()
+
+# Background tasks. These run on the task queue workers after the request that
+# triggered them has committed, so they never add to request latency. The
+# handlers below are placeholders that only log until a mail provider and a
+# search index are wired in.
+@task_queue.task('send_notification_email', batch=True)
+def send_notification_emails(payloads):
+    # Application notifications go to the employer that owns the job; resolve
+    # all of their addresses for the batch in one query
+    job_ids = {payload['job_id'] for payload in payloads if 'to' not in payload}
+    employer_emails = {}
+    if job_ids:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute('''
+                SELECT j.job_id, u.email
+                FROM jobs j
+                JOIN companies c ON j.company_id = c.company_id
+                JOIN users u ON c.user_id = u.user_id
+                WHERE j.job_id IN (%s)
+            ''' % ', '.join(['%s'] * len(job_ids)), tuple(job_ids))
+            employer_emails = dict(cursor.fetchall())
+        finally:
+            cursor.close()
+            conn.close()
+    
+    for payload in payloads:
+        to = payload.get('to') or employer_emails.get(payload['job_id'])
+        if to:
+            app.logger.info('Sending %s email to %s', payload['template'], to)
+
+@task_queue.task('update_search_index', batch=True)
+def update_search_index(payloads):
+    job_ids = sorted({payload['job_id'] for payload in payloads})
+    app.logger.info('Reindexing jobs %s', job_ids)
+
+@task_queue.task('refresh_counters', batch=True)
+def refresh_counters(payloads):
+    job_ids = sorted({payload['job_id'] for payload in payloads})
+    app.logger.info('Refreshing application counters for jobs %s', job_ids)
+
+# Rate limiting and admission control
+
+# The address a request came from, given the peer that connected to us and the
+# X-Forwarded-For it sent. Each proxy appends the address it received the
+# request from, so walk the header from the right and stop at the first hop we
+# don't trust; anything left of that could have been sent by the client itself.
+def resolve_client_address(remote_addr, forwarded):
+    address = remote_addr
+    if not forwarded or address not in TRUSTED_PROXIES:
+        return address
+    for hop in reversed([hop.strip() for hop in forwarded.split(',') if hop.strip()]):
+        address = hop
+        if hop not in TRUSTED_PROXIES:
+            break
+    return address
+
+def client_address():
+    return resolve_client_address(request.remote_addr, request.headers.get('X-Forwarded-For'))
+
+@app.before_request
+def limit_request():
+    if request.endpoint is None or request.endpoint == 'static' or request.method == 'OPTIONS':
+        return None
+    
+    retry_after = rate_limiter.check(request.endpoint, session.get('user_id') or client_address())
+    if retry_after:
+        response = jsonify({'error': 'Too many requests'})
+        response.status_code = 429
+        response.headers['Retry-After'] = str(retry_after)
+        return response
+    
+    if request.endpoint not in ADMISSION_EXEMPT:
+        if not db_admission.acquire():
+            raise Overloaded()
+        g.admitted = True
+    return None
+
+@app.teardown_request
+def release_admission(exc):
+    if g.pop('admitted', False):
+        db_admission.release()
+
+@app.errorhandler(Overloaded)
+def handle_overloaded(err):
+    response = jsonify({'error': 'Server is busy, please retry shortly'})
+    response.status_code = 503
+    response.headers['Retry-After'] = '1'
+    return response
+
 # Routes
 @app.route('/api/login', methods=['POST'])
 def login():
@@ -88,7 +284,6 @@ def register():
     try:
         cursor.execute('INSERT INTO users (username, password, email, user_type) VALUES (%s, %s, %s, %s)',
                       (username, password, email, user_type))
-        conn.commit()
         user_id = cursor.lastrowid
         
         # Create corresponding profile based on user type
@@ -102,7 +297,11 @@ def register():
             cursor.execute('INSERT INTO seeker_profiles (user_id, first_name, last_name) VALUES (%s, %s, %s)',
                           (user_id, first_name, last_name))
         
+        # User and profile are committed together, side effects only run once
+        # the commit has succeeded
         conn.commit()
+        read_coalescer.invalidate(('profile', user_type, user_id))
+        enqueue_after_commit('send_notification_email', {'to': email, 'template': 'welcome'})
         return jsonify({'message': 'Registration successful', 'user_id': user_id}), 201
     
     except mysql.connector.Error as err:
@@ -111,34 +310,63 @@ def register():
         cursor.close()
         conn.close()
 
-@app.route('/api/jobs', methods=['GET'])
-def get_jobs():
+def query_jobs(include_history):
     conn = get_db_connection()
     cursor = conn.cursor(dictionary=True)
     
     try:
-        cursor.execute('''
-            SELECT j.*, c.company_name, c.location as company_location
-            FROM jobs j
-            JOIN companies c ON j.company_id = c.company_id
-            ORDER BY j.posting_date DESC
-        ''')
+        if include_history:
+            cursor.execute(f'''
+                SELECT j.*, c.company_name, c.location as company_location
+                FROM {ALL_JOBS} j
+                JOIN companies c ON j.company_id = c.company_id
+                ORDER BY j.posting_date DESC
+            ''')
+        else:
+            cursor.execute(f'''
+                SELECT j.*, c.company_name, c.location as company_location
+                FROM jobs j
+                JOIN companies c ON j.company_id = c.company_id
+                WHERE {OPEN_JOB_CONDITION}
+                ORDER BY j.posting_date DESC
+            ''')
         
         jobs = cursor.fetchall()
         
         # Convert datetime objects to strings for JSON serialization
         for job in jobs:
-            if 'posting_date' in job and isinstance(job['posting_date'], datetime):
-                job['posting_date'] = job['posting_date'].strftime('%Y-%m-%d %H:%M:%S')
+            for key in ('posting_date', 'expires_at', 'closed_at'):
+                if isinstance(job.get(key), datetime):
+                    job[key] = job[key].strftime('%Y-%m-%d %H:%M:%S')
         
-        return jsonify(jobs)
-    
-    except mysql.connector.Error as err:
-        return jsonify({'error': f'Database error: {str(err)}'}), 500
+        return jobs
     finally:
         cursor.close()
         conn.close()
 
+# Job listing with its serialized body and ETag, computed once per
+# load so coalesced requests don't reserialize or rehash it. The rows are
+# shared by every caller and must not be modified.
+def load_jobs_response(include_history):
+    with db_admission:
+        jobs = query_jobs(include_history)
+    body = json.dumps(jobs)
+    etag = hashlib.sha1(body.encode()).hexdigest()
+    return jobs, body, etag
+
+@app.route('/api/jobs', methods=['GET'])
+def get_jobs():
+    include_history = request.args.get('history') == '1'
+    
+    try:
+        _, body, etag = read_coalescer.do(('jobs', include_history), lambda: load_jobs_response(include_history))
+    except mysql.connector.Error as err:
+        return jsonify({'error': f'Database error: {str(err)}'}), 500
+    
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag, weak=True)
+    return response
+
 @app.route('/api/jobs', methods=['POST'])
 def create_job():
     data = request.json
@@ -152,6 +380,12 @@ def create_job():
         if field not in data:
             return jsonify({'error': f'Field {field} is required'}), 400
     
+    expires_at = data.get('expires_at')
+    if expires_at is not None:
+        expires_at = parse_timestamp(expires_at)
+        if expires_at is None:
+            return jsonify({'error': 'expires_at must be YYYY-MM-DD or YYYY-MM-DD HH:MM:SS'}), 400
+    
     conn = get_db_connection()
     cursor = conn.cursor()
     
@@ -166,12 +400,95 @@ def create_job():
         company_id = company[0]
         
         cursor.execute('''
-            INSERT INTO jobs (company_id, title, description, salary, location, job_type)
-            VALUES (%s, %s, %s, %s, %s, %s)
-        ''', (company_id, data['title'], data['description'], data['salary'], data['location'], data['job_type']))
+            INSERT INTO jobs (company_id, title, description, salary, location, job_type, expires_at)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+        ''', (company_id, data['title'], data['description'], data['salary'], data['location'], data['job_type'],
+              expires_at))
+        
+        conn.commit()
+        job_id = cursor.lastrowid
+        read_coalescer.invalidate(('jobs', False), ('jobs', True))
+        enqueue_after_commit('update_search_index', {'job_id': job_id})
+        return jsonify({'message': 'Job created successfully', 'job_id': job_id}), 201
+    
+    except mysql.connector.Error as err:
+        return jsonify({'error': f'Database error: {str(err)}'}), 500
+    finally:
+        cursor.close()
+        conn.close()
+
+# All hot jobs of a company, including closed ones. Returns None if the
+# company doesn't belong to user_id.
+def query_company_jobs(company_id, user_id):
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+    
+    try:
+        # Check if the company belongs to the logged-in employer
+        cursor.execute('SELECT company_id FROM companies WHERE company_id = %s AND user_id = %s', (company_id, user_id))
+        if not cursor.fetchone():
+            return None
+        
+        cursor.execute('''
+            SELECT * FROM jobs
+            WHERE company_id = %s
+            ORDER BY posting_date DESC
+        ''', (company_id,))
+        
+        jobs = cursor.fetchall()
+        
+        # Convert datetime objects to strings for JSON serialization
+        for job in jobs:
+            for key in ('posting_date', 'expires_at', 'closed_at'):
+                if isinstance(job.get(key), datetime):
+                    job[key] = job[key].strftime('%Y-%m-%d %H:%M:%S')
+        
+        return jobs
+    finally:
+        cursor.close()
+        conn.close()
+
+@app.route('/api/jobs/company/<int:company_id>', methods=['GET'])
+def get_company_jobs(company_id):
+    user_id = session.get('user_id')
+    
+    if not user_id or session.get('user_type') != 'employer':
+        return jsonify({'error': 'Unauthorized access'}), 403
+    
+    try:
+        jobs = query_company_jobs(company_id, user_id)
+    except mysql.connector.Error as err:
+        return jsonify({'error': f'Database error: {str(err)}'}), 500
+    
+    if jobs is None:
+        return jsonify({'error': 'You don\'t have access to this company'}), 403
+    
+    return jsonify(jobs)
+
+@app.route('/api/jobs/<int:job_id>/close', methods=['POST'])
+def close_job(job_id):
+    user_id = session.get('user_id')
+    
+    if not user_id or session.get('user_type') != 'employer':
+        return jsonify({'error': 'Unauthorized access'}), 403
+    
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    
+    try:
+        cursor.execute('''
+            UPDATE jobs j
+            JOIN companies c ON j.company_id = c.company_id
+            SET j.closed_at = NOW()
+            WHERE j.job_id = %s AND c.user_id = %s AND j.closed_at IS NULL
+        ''', (job_id, user_id))
+        
+        if cursor.rowcount == 0:
+            return jsonify({'error': 'Job not found or already closed'}), 404
         
         conn.commit()
-        return jsonify({'message': 'Job created successfully', 'job_id': cursor.lastrowid}), 201
+        read_coalescer.invalidate(('jobs', False), ('jobs', True))
+        return jsonify({'message': 'Job closed successfully'})
     
     except mysql.connector.Error as err:
         return jsonify({'error': f'Database error: {str(err)}'}), 500
@@ -206,6 +523,11 @@ def apply_for_job():
         
         profile_id = profile[0]
         
+        # Closed and expired jobs no longer accept applications
+        cursor.execute(f'SELECT j.job_id FROM jobs j WHERE j.job_id = %s AND {OPEN_JOB_CONDITION}', (job_id,))
+        if not cursor.fetchone():
+            return jsonify({'error': 'Job not found or no longer accepting applications'}), 404
+        
         # Check if already applied
         cursor.execute('SELECT * FROM applications WHERE job_id = %s AND profile_id = %s', (job_id, profile_id))
         if cursor.fetchone():
@@ -217,6 +539,8 @@ def apply_for_job():
         ''', (job_id, profile_id, cover_letter))
         
         conn.commit()
+        enqueue_after_commit('send_notification_email', {'job_id': job_id, 'template': 'application_submitted'})
+        enqueue_after_commit('refresh_counters', {'job_id': job_id})
         return jsonify({'message': 'Application submitted successfully'}), 201
     
     except mysql.connector.Error as err:
@@ -225,8 +549,7 @@ def apply_for_job():
         cursor.close()
         conn.close()
 
-@app.route('/api/profile/<user_type>/<int:user_id>', methods=['GET'])
-def get_profile(user_type, user_id):
+def query_profile(user_type, user_id):
     conn = get_db_connection()
     cursor = conn.cursor(dictionary=True)
     
@@ -238,29 +561,40 @@ def get_profile(user_type, user_id):
                 JOIN users u ON sp.user_id = u.user_id
                 WHERE sp.user_id = %s
             ''', (user_id,))
-        elif user_type == 'employer':
+        else:
             cursor.execute('''
                 SELECT c.*, u.email, u.username
                 FROM companies c
                 JOIN users u ON c.user_id = u.user_id
                 WHERE c.user_id = %s
             ''', (user_id,))
-        else:
-            return jsonify({'error': 'Invalid user type'}), 400
-        
-        profile = cursor.fetchone()
-        
-        if not profile:
-            return jsonify({'error': 'Profile not found'}), 404
         
-        return jsonify(profile)
-    
-    except mysql.connector.Error as err:
-        return jsonify({'error': f'Database error: {str(err)}'}), 500
+        return cursor.fetchone()
     finally:
         cursor.close()
         conn.close()
 
+def load_profile_response(user_type, user_id):
+    with db_admission:
+        profile = query_profile(user_type, user_id)
+    return profile, json.dumps(profile)
+
+@app.route('/api/profile/<user_type>/<int:user_id>', methods=['GET'])
+def get_profile(user_type, user_id):
+    if user_type not in ('seeker', 'employer'):
+        return jsonify({'error': 'Invalid user type'}), 400
+    
+    try:
+        profile, body = read_coalescer.do(('profile', user_type, user_id),
+                                          lambda: load_profile_response(user_type, user_id))
+    except mysql.connector.Error as err:
+        return jsonify({'error': f'Database error: {str(err)}'}), 500
+    
+    if profile is None:
+        return jsonify({'error': 'Profile not found'}), 404
+    
+    return Response(body, mimetype='application/json')
+
 @app.route('/api/applications/employer/<int:company_id>', methods=['GET'])
 def get_employer_applications(company_id):
     user_id = session.get('user_id')
@@ -281,12 +615,12 @@ def get_employer_applications(company_id):
             SELECT a.*, j.title as job_title, j.job_type,
                    CONCAT(sp.first_name, ' ', sp.last_name) as applicant_name,
                    sp.skills, sp.experience, sp.education
-            FROM applications a
-            JOIN jobs j ON a.job_id = j.job_id
+            FROM {applications} a
+            JOIN {jobs} j ON a.job_id = j.job_id
             JOIN seeker_profiles sp ON a.profile_id = sp.profile_id
             WHERE j.company_id = %s
             ORDER BY a.application_date DESC
-        ''', (company_id,))
+        '''.format(**application_sources(request.args.get('history') == '1')), (company_id,))
         
         applications = cursor.fetchall()
         
@@ -303,31 +637,139 @@ def get_employer_applications(company_id):
         cursor.close()
         conn.close()
 
-@app.route('/api/applications/seeker/<int:profile_id>', methods=['GET'])
-def get_seeker_applications(profile_id):
+@app.route('/api/applications/employer/<int:company_id>/export', methods=['GET'])
+def export_employer_applications(company_id):
     user_id = session.get('user_id')
     
-    if not user_id or session.get('user_type') != 'seeker':
+    if not user_id or session.get('user_type') != 'employer':
         return jsonify({'error': 'Unauthorized access'}), 403
     
+    export_format = request.args.get('format', 'csv')
+    if export_format not in ('csv', 'ndjson'):
+        return jsonify({'error': 'Format must be csv or ndjson'}), 400
+    
+    # Optional filters; ?after=<application_id> resumes an interrupted export
+    filters = ['j.company_id = %s']
+    params = [company_id]
+    if request.args.get('job_id'):
+        job_id = request.args.get('job_id', type=int)
+        if job_id is None:
+            return jsonify({'error': 'job_id must be an integer'}), 400
+        filters.append('a.job_id = %s')
+        params.append(job_id)
+    if request.args.get('status'):
+        if request.args['status'] not in APPLICATION_STATUSES:
+            return jsonify({'error': 'Invalid status'}), 400
+        filters.append('a.status = %s')
+        params.append(request.args['status'])
+    for arg, condition in (('since', 'a.application_date >= %s'), ('until', 'a.application_date < %s')):
+        if request.args.get(arg):
+            value = parse_timestamp(request.args[arg])
+            if value is None:
+                return jsonify({'error': f'{arg} must be YYYY-MM-DD or YYYY-MM-DD HH:MM:SS'}), 400
+            filters.append(condition)
+            params.append(value)
+    after = request.args.get('after', 0, type=int)
+    if after is None:
+        return jsonify({'error': 'after must be an integer'}), 400
+    include_history = request.args.get('history') == '1'
+    
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    
+    try:
+        # Check if the company belongs to the logged-in employer
+        cursor.execute('SELECT company_id FROM companies WHERE company_id = %s AND user_id = %s', (company_id, user_id))
+        if not cursor.fetchone():
+            return jsonify({'error': 'You don\'t have access to this company'}), 403
+    except mysql.connector.Error as err:
+        return jsonify({'error': f'Database error: {str(err)}'}), 500
+    finally:
+        cursor.close()
+        conn.close()
+    
+    # Keyset pagination on application_id keeps every page query cheap and
+    # makes the last exported application_id a resumable offset. With
+    # ?history=1 the hot and archive tables are paged separately, straight
+    # off their own indexes, and merged by application_id.
+    query = '''
+        SELECT a.application_id, a.job_id, j.title, j.job_type, a.profile_id,
+               CONCAT(sp.first_name, ' ', sp.last_name),
+               a.status, a.application_date, sp.skills, sp.experience, sp.education, a.cover_letter
+        FROM {applications} a
+        JOIN {jobs} j ON a.job_id = j.job_id
+        JOIN seeker_profiles sp ON a.profile_id = sp.profile_id
+        WHERE {filters} AND a.application_id > %s
+        ORDER BY a.application_id
+        LIMIT %s
+    '''
+    queries = [query.format(filters=' AND '.join(filters), applications='applications', jobs='jobs')]
+    if include_history:
+        queries.append(query.format(filters=' AND '.join(filters),
+                                    applications='applications_archive', jobs='jobs_archive'))
+    
+    # Pages are read after the request's own admission slot is released, so
+    # each one takes a slot of its own
+    def fetch_page(page_query, last_id):
+        with db_admission:
+            conn = get_db_connection()
+            cursor = conn.cursor(buffered=False)
+            try:
+                cursor.execute(page_query, (*params, last_id, EXPORT_PAGE_SIZE))
+                return cursor.fetchall()
+            finally:
+                cursor.close()
+                conn.close()
+    
+    def read_pages(page_query):
+        last_id = after
+        while True:
+            rows = fetch_page(page_query, last_id)
+            yield from rows
+            if len(rows) < EXPORT_PAGE_SIZE:
+                break
+            last_id = rows[-1][0]
+    
+    def encode(row):
+        row = [value.strftime('%Y-%m-%d %H:%M:%S') if isinstance(value, datetime) else value for value in row]
+        if export_format == 'ndjson':
+            return json.dumps(dict(zip(EXPORT_COLUMNS, row))) + '\n'
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(row)
+        return buffer.getvalue()
+    
+    def generate():
+        if export_format == 'csv':
+            yield encode(EXPORT_COLUMNS)
+        for row in heapq.merge(*[read_pages(page_query) for page_query in queries], key=lambda row: row[0]):
+            yield encode(row)
+    
+    mimetype = 'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+    return Response(generate(), mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename=applications-{company_id}.{export_format}',
+        'Cache-Control': 'private, no-store'
+    })
+
+# Returns None if the profile doesn't belong to user_id
+def query_seeker_applications(profile_id, user_id, include_history=False):
     conn = get_db_connection()
     cursor = conn.cursor(dictionary=True)
     
     try:
         # Check if the profile belongs to the logged-in seeker
-        cursor.execute('SELECT * FROM seeker_profiles WHERE profile_id = %s AND user_id = %s', (profile_id, user_id))
+        cursor.execute('SELECT profile_id FROM seeker_profiles WHERE profile_id = %s AND user_id = %s', (profile_id, user_id))
         if not cursor.fetchone():
-            return jsonify({'error': 'You don\'t have access to this profile'}), 403
+            return None
         
         cursor.execute('''
             SELECT a.*, j.title as job_title, j.job_type, j.salary, j.location,
                    c.company_name
-            FROM applications a
-            JOIN jobs j ON a.job_id = j.job_id
+            FROM {applications} a
+            JOIN {jobs} j ON a.job_id = j.job_id
             JOIN companies c ON j.company_id = c.company_id
             WHERE a.profile_id = %s
             ORDER BY a.application_date DESC
-        ''', (profile_id,))
+        '''.format(**application_sources(include_history)), (profile_id,))
         
         applications = cursor.fetchall()
         
@@ -336,7 +778,70 @@ def get_seeker_applications(profile_id):
             if 'application_date' in app and isinstance(app['application_date'], datetime):
                 app['application_date'] = app['application_date'].strftime('%Y-%m-%d %H:%M:%S')
         
-        return jsonify(applications)
+        return applications
+    finally:
+        cursor.close()
+        conn.close()
+
+@app.route('/api/applications/seeker/<int:profile_id>', methods=['GET'])
+def get_seeker_applications(profile_id):
+    user_id = session.get('user_id')
+    
+    if not user_id or session.get('user_type') != 'seeker':
+        return jsonify({'error': 'Unauthorized access'}), 403
+    
+    try:
+        applications = query_seeker_applications(profile_id, user_id, request.args.get('history') == '1')
+    except mysql.connector.Error as err:
+        return jsonify({'error': f'Database error: {str(err)}'}), 500
+    
+    if applications is None:
+        return jsonify({'error': 'You don\'t have access to this profile'}), 403
+    
+    return jsonify(applications)
+
+@app.route('/api/applications/<int:application_id>/status', methods=['PUT'])
+def update_application_status(application_id):
+    data = request.json
+    user_id = session.get('user_id')
+    
+    if not user_id or session.get('user_type') != 'employer':
+        return jsonify({'error': 'Unauthorized access'}), 403
+    
+    status = data.get('status')
+    if status not in APPLICATION_STATUSES:
+        return jsonify({'error': 'Invalid status'}), 400
+    
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+    
+    try:
+        # The application must be for a job posted by the logged-in employer
+        cursor.execute('''
+            SELECT a.status, a.job_id, sp.user_id as seeker_user_id
+            FROM applications a
+            JOIN jobs j ON a.job_id = j.job_id
+            JOIN companies c ON j.company_id = c.company_id
+            JOIN seeker_profiles sp ON a.profile_id = sp.profile_id
+            WHERE a.application_id = %s AND c.user_id = %s
+        ''', (application_id, user_id))
+        application = cursor.fetchone()
+        
+        if not application:
+            return jsonify({'error': 'Application not found'}), 404
+        
+        cursor.execute('UPDATE applications SET status = %s WHERE application_id = %s', (status, application_id))
+        conn.commit()
+        
+        if application['status'] != status:
+            application_events.publish(application['seeker_user_id'], {
+                'application_id': application_id,
+                'job_id': application['job_id'],
+                'old_status': application['status'],
+                'status': status
+            })
+        
+        return jsonify({'message': 'Application status updated'})
     
     except mysql.connector.Error as err:
         return jsonify({'error': f'Database error: {str(err)}'}), 500
@@ -344,5 +849,46 @@ def get_seeker_applications(profile_id):
         cursor.close()
         conn.close()
 
+@app.route('/api/me/applications/stream', methods=['GET'])
+def stream_my_applications():
+    user_id = session.get('user_id')
+    
+    if not user_id or session.get('user_type') != 'seeker':
+        return jsonify({'error': 'Unauthorized access'}), 403
+    
+    # Subscribe inside the generator so a response whose body is never
+    # iterated (e.g. a HEAD request) doesn't leave a subscriber behind
+    def generate():
+        subscription = application_events.subscribe(user_id)
+        try:
+            yield f'retry: {STREAM_KEEPALIVE * 1000}\n\n'
+            while True:
+                events = subscription.get(timeout=STREAM_KEEPALIVE)
+                if not events:
+                    yield ': keepalive\n\n'
+                for event in events:
+                    yield f'event: status\ndata: {json.dumps(event)}\n\n'
+        finally:
+            subscription.close()
+    
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    return jsonify({
+        'tasks': task_queue.metrics(),
+        'streams': application_events.metrics(),
+        'reads': read_coalescer.metrics(),
+        'rate_limit': rate_limiter.metrics(),
+        'admission': db_admission.metrics()
+    })
+
 if __name__ == '__main__':
+    # With the reloader, requests are served by the child process; start the
+    # workers there rather than in the parent that only watches for changes
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        task_queue.start()
     app.run(debug=True, port=5000)
\ No newline at end of file
@@ -0,0 +1,118 @@
+# archive.py - Moves cold jobs and their applications into the archive tables
+#
+# A job is cold once it has been closed or has expired for longer than the
+# retention window, or was posted before the cutoff month and has since been
+# closed or expired. Open jobs are never archived, so their applications stay
+# visible to the default listings and status updates. Rows are moved a
+# small batch of jobs at a time, each batch in its own short transaction, so
+# the hot tables are never locked for long. Run it from cron, e.g.
+#
+#     python archive.py --months 6 --batch-size 200
+
+import argparse
+import time
+from datetime import datetime
+
+from app import get_db_connection
+
+JOB_COLUMNS = ('job_id, company_id, title, description, salary, location, job_type, '
+               'posting_date, expires_at, closed_at')
+APPLICATION_COLUMNS = 'application_id, job_id, profile_id, application_date, status, cover_letter'
+
+# First day of the month `months` months before now
+def cutoff_month(months, now=None):
+    now = now or datetime.now()
+    index = now.year * 12 + now.month - 1 - months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+# Whether a job is cold, as a WHERE clause taking (closed_before,
+# closed_before, cutoff)
+ARCHIVABLE = ('(closed_at < %s OR expires_at < %s '
+              'OR (posting_date < %s AND (closed_at IS NOT NULL OR expires_at < NOW())))')
+
+# Candidate cold jobs, as the same test split by column so each half is a
+# range scan on a covering index (idx_jobs_open, idx_jobs_expires) instead of
+# a scan of the whole table
+CANDIDATES = '''
+    SELECT job_id FROM jobs
+    WHERE closed_at IS NOT NULL AND (closed_at < %s OR posting_date < %s)
+    UNION
+    SELECT job_id FROM jobs
+    WHERE expires_at < NOW() AND (expires_at < %s OR posting_date < %s)
+    ORDER BY job_id
+'''
+
+def archive_jobs(cutoff, closed_before, batch_size=200, pause=0.1):
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    archived_jobs = 0
+    archived_applications = 0
+
+    try:
+        # Find the candidates once, then move them in batches, so the run reads
+        # each cold job a constant number of times however many there are
+        cursor.execute(CANDIDATES, (closed_before, cutoff, closed_before, cutoff))
+        candidates = [row[0] for row in cursor.fetchall()]
+        conn.commit()
+
+        for start in range(0, len(candidates), batch_size):
+            batch = candidates[start:start + batch_size]
+            placeholders = ', '.join(['%s'] * len(batch))
+
+            # Lock the batch and check it again, in case a job changed since
+            # the candidates were read
+            cursor.execute(f'''
+                SELECT job_id FROM jobs
+                WHERE job_id IN ({placeholders}) AND {ARCHIVABLE}
+                FOR UPDATE
+            ''', batch + [closed_before, closed_before, cutoff])
+            job_ids = [row[0] for row in cursor.fetchall()]
+
+            if not job_ids:
+                conn.commit()
+                continue
+
+            placeholders = ', '.join(['%s'] * len(job_ids))
+            cursor.execute(f'''
+                INSERT INTO jobs_archive ({JOB_COLUMNS})
+                SELECT {JOB_COLUMNS} FROM jobs WHERE job_id IN ({placeholders})
+            ''', job_ids)
+            cursor.execute(f'''
+                INSERT INTO applications_archive ({APPLICATION_COLUMNS})
+                SELECT {APPLICATION_COLUMNS} FROM applications WHERE job_id IN ({placeholders})
+            ''', job_ids)
+            archived_applications += cursor.rowcount
+            cursor.execute(f'DELETE FROM applications WHERE job_id IN ({placeholders})', job_ids)
+            cursor.execute(f'DELETE FROM jobs WHERE job_id IN ({placeholders})', job_ids)
+            conn.commit()
+            archived_jobs += len(job_ids)
+
+            # Give other writers a chance at the locks between batches
+            time.sleep(pause)
+
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+    return archived_jobs, archived_applications
+
+def main():
+    parser = argparse.ArgumentParser(description='Archive old jobs and applications')
+    parser.add_argument('--months', type=int, default=6,
+                        help='archive closed or expired jobs posted before the start of this many months ago')
+    parser.add_argument('--closed-days', type=int, default=30,
+                        help='archive jobs closed or expired more than this many days ago')
+    parser.add_argument('--batch-size', type=int, default=200)
+    parser.add_argument('--pause', type=float, default=0.1, help='seconds to sleep between batches')
+    args = parser.parse_args()
+
+    cutoff = cutoff_month(args.months)
+    closed_before = datetime.fromtimestamp(time.time() - args.closed_days * 86400)
+    jobs, applications = archive_jobs(cutoff, closed_before, args.batch_size, args.pause)
+    print(f'Archived {jobs} jobs and {applications} applications')
+
+if __name__ == '__main__':
+    main()
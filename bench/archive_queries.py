@@ -0,0 +1,106 @@
+# archive_queries.py - Hot-set vs full-history listing latency
+#
+# Times the default listings, which only read the hot tables, against the
+# ?history=1 variants that also read jobs_archive and applications_archive:
+# query_jobs(), query_seeker_applications() and the employer applications
+# listing, each for the sample seeker and employer in job_portal.sql.
+#
+# With --seed N it first inserts N jobs (each with a few applications) that
+# were closed a year ago and moves them into the archive with
+# archive.archive_jobs(), reporting how long the archival run took, so the
+# archive has something in it to compare against. Seeded rows are left in
+# place; run it against a scratch copy of the database:
+#
+#     python bench/archive_queries.py --seed 20000 --requests 200
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import app as backend
+import archive
+
+SEEKER_USER_ID, SEEKER_PROFILE_ID = 1, 1
+EMPLOYER_USER_ID, COMPANY_ID = 3, 1
+
+def seed(jobs, applications_per_job, chunk=1000):
+    conn = backend.get_db_connection()
+    cursor = conn.cursor()
+    posted = datetime.now() - timedelta(days=730)
+    closed = datetime.now() - timedelta(days=365)
+    try:
+        for start in range(0, jobs, chunk):
+            count = min(chunk, jobs - start)
+            cursor.executemany('''
+                INSERT INTO jobs (company_id, title, description, salary, location, job_type, posting_date, closed_at)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            ''', [(COMPANY_ID, f'Archived role {start + i}', 'Seeded by bench/archive_queries.py', '5-8 LPA',
+                   'Mumbai, India', 'full-time', posted, closed) for i in range(count)])
+            first_id = cursor.lastrowid
+            cursor.executemany('''
+                INSERT INTO applications (job_id, profile_id, application_date, status, cover_letter)
+                VALUES (%s, %s, %s, %s, %s)
+            ''', [(job_id, 1 + n % 2, posted, 'rejected', 'Seeded')
+                  for job_id in range(first_id, first_id + count) for n in range(applications_per_job)])
+            conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+
+def employer_applications(client, include_history):
+    response = client.get(f'/api/applications/employer/{COMPANY_ID}' + ('?history=1' if include_history else ''))
+    if response.status_code != 200:
+        raise SystemExit(f'Employer listing failed: {response.get_json()}')
+    return response.get_json()
+
+def measure(load, count):
+    rows = len(load())  # warm up the connection and buffer pool
+    timings = []
+    for _ in range(count):
+        started = time.perf_counter()
+        load()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return rows, statistics.median(timings), timings[int(len(timings) * 0.95) - 1]
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare hot-table and full-history listing latency')
+    parser.add_argument('--requests', type=int, default=200, help='calls per listing and variant')
+    parser.add_argument('--seed', type=int, default=0, help='closed jobs to insert and archive first')
+    parser.add_argument('--applications-per-job', type=int, default=3)
+    args = parser.parse_args()
+
+    if args.seed:
+        seed(args.seed, args.applications_per_job)
+        started = time.perf_counter()
+        jobs, applications = archive.archive_jobs(archive.cutoff_month(6), datetime.now() - timedelta(days=30),
+                                                  batch_size=200, pause=0)
+        print(f'archived {jobs} jobs and {applications} applications in {time.perf_counter() - started:.1f} s')
+
+    backend.rate_limiter.rules = {}
+    backend.rate_limiter.default = (1e9, 1e9)
+    client = backend.app.test_client()
+    with client.session_transaction() as session:
+        session['user_id'] = EMPLOYER_USER_ID
+        session['user_type'] = 'employer'
+
+    listings = [
+        ('jobs', lambda history: backend.query_jobs(history)),
+        ('seeker applications',
+         lambda history: backend.query_seeker_applications(SEEKER_PROFILE_ID, SEEKER_USER_ID, history)),
+        ('employer applications', lambda history: employer_applications(client, history)),
+    ]
+
+    print(f'{"listing":<24}{"variant":<10}{"rows":>8}{"median ms":>11}{"p95 ms":>10}')
+    for name, load in listings:
+        for variant, history in (('hot', False), ('history', True)):
+            rows, median, p95 = measure(lambda: load(history), args.requests)
+            print(f'{name:<24}{variant:<10}{rows:>8}{median:>11.3f}{p95:>10.3f}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+# compression.py - Bytes on the wire and CPU per request for /api/jobs
+#
+# Serves a synthetic job listing through the backend app's test client (no
+# MySQL needed; query_jobs is replaced with generated rows) and reports the
+# response size and CPU time per request for each negotiated encoding:
+#
+#   cold         every request compresses (precompressed cache cleared)
+#   warm         the compressed body comes from the precompressed cache
+#   revalidate   the client sends If-None-Match and gets a 304
+#
+#     python bench/compression.py --jobs 200 --requests 500
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import app as backend
+import http_cache
+
+DESCRIPTION = ('We are looking for an experienced engineer to join our team. You will design, build and '
+               'maintain services, review code and mentor junior developers. ')
+
+def fake_jobs(count):
+    return [{
+        'job_id': i,
+        'company_id': i % 20,
+        'title': f'Software Engineer {i}',
+        'description': DESCRIPTION * (3 + i % 5),
+        'salary': f'{5 + i % 10}-{10 + i % 10} LPA',
+        'location': 'Bangalore, India',
+        'job_type': 'full-time',
+        'posting_date': f'2024-{1 + i % 12:02d}-{1 + i % 28:02d} 10:00:00',
+        'expires_at': None,
+        'closed_at': None,
+        'company_name': f'Company {i % 20}',
+        'company_location': 'Bangalore, India'
+    } for i in range(count)]
+
+def run(client, cache, count, headers, clear_cache):
+    sizes = 0
+    status = None
+    started = time.process_time()
+    for _ in range(count):
+        if clear_cache:
+            cache._entries.clear()
+        response = client.get('/api/jobs', headers=headers)
+        sizes += len(response.get_data())
+        status = response.status_code
+    cpu = (time.process_time() - started) / count
+    return status, sizes // count, cpu * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure response compression on the job listing')
+    parser.add_argument('--jobs', type=int, default=200, help='jobs in the synthetic listing')
+    parser.add_argument('--requests', type=int, default=500, help='requests per scenario')
+    args = parser.parse_args()
+
+    jobs = fake_jobs(args.jobs)
+    backend.query_jobs = lambda include_history: jobs
+    backend.rate_limiter.rules = {}
+    backend.rate_limiter.default = (1e9, 1e9)
+    cache = backend.compressed_responses
+    client = backend.app.test_client()
+
+    encodings = ['identity', 'gzip'] + (['br'] if http_cache.brotli is not None else [])
+    etag = client.get('/api/jobs').headers['ETag']
+
+    print(f'{"encoding":<10}{"scenario":<12}{"status":>7}{"bytes":>10}{"cpu ms/req":>12}')
+    for encoding in encodings:
+        headers = {'Accept-Encoding': encoding}
+        scenarios = [('cold', headers, True), ('warm', headers, False),
+                     ('revalidate', {**headers, 'If-None-Match': etag}, False)]
+        for scenario, request_headers, clear_cache in scenarios:
+            if encoding == 'identity' and scenario == 'cold':
+                continue
+            status, size, cpu = run(client, cache, args.requests, request_headers, clear_cache)
+            print(f'{encoding:<10}{scenario:<12}{status:>7}{size:>10}{cpu:>12.3f}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+# embedded_pages.py - Per-page backend latency, HTTP vs embedded client
+#
+# Replays the backend calls that index(), my_applications() and
+# manage_jobs() make for one page view, through HttpClient (against the
+# backend served on a local port) and through EmbeddedClient, and reports
+# median and p95 latency per page. Template rendering is identical in both
+# modes, so the difference is the cost of the frontend-to-backend hop.
+#
+# Needs the MySQL database from job_portal.sql (with its sample users):
+#
+#     python bench/embedded_pages.py --requests 500
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from werkzeug.serving import make_server
+
+import app as backend
+import frontend
+from api_client import HttpClient, EmbeddedClient
+
+SEEKER = {'username': 'rajesh123', 'password': 'password123'}
+EMPLOYER = {'username': 'amit_hr', 'password': 'company789'}
+
+# The same calls, in the same order, as the frontend views
+def index(api, user_id):
+    api.get('/jobs').json()
+
+def my_applications(api, user_id):
+    profile = api.get(f'/profile/seeker/{user_id}').json()
+    api.get(f'/applications/seeker/{profile["profile_id"]}').json()
+
+def manage_jobs(api, user_id):
+    company = api.get(f'/profile/employer/{user_id}').json()
+    api.get(f'/jobs/company/{company["company_id"]}').json()
+
+PAGES = [('index', index, SEEKER), ('my_applications', my_applications, SEEKER),
+         ('manage_jobs', manage_jobs, EMPLOYER)]
+
+def measure(api, page, credentials, count):
+    with frontend.app.test_request_context('/'):
+        response = api.post('/login', json=credentials)
+        if response.status_code != 200:
+            raise SystemExit(f'Login as {credentials["username"]} failed: {response.json()}')
+        user_id = response.json()['user']['id']
+
+        page(api, user_id)  # warm up connections and caches
+        timings = []
+        for _ in range(count):
+            started = time.perf_counter()
+            page(api, user_id)
+            timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95) - 1]
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare per-page latency of the HTTP and embedded clients')
+    parser.add_argument('--requests', type=int, default=500, help='page views per page and mode')
+    parser.add_argument('--port', type=int, default=5099, help='port to serve the backend on for HTTP mode')
+    parser.add_argument('--no-cache', action='store_true', help='disable read coalescing/caching')
+    args = parser.parse_args()
+
+    # Measure the hop, not the limiter
+    backend.rate_limiter.rules = {}
+    backend.rate_limiter.default = (1e9, 1e9)
+    if args.no_cache:
+        backend.read_coalescer.ttl = backend.read_coalescer.stale_ttl = 0
+
+    server = make_server('127.0.0.1', args.port, backend.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    clients = [('http', HttpClient(f'http://127.0.0.1:{args.port}/api')), ('embedded', EmbeddedClient())]
+
+    try:
+        print(f'{"page":<18}{"mode":<10}{"median ms":>10}{"p95 ms":>10}')
+        for name, page, credentials in PAGES:
+            medians = {}
+            for mode, api in clients:
+                median, p95 = measure(api, page, credentials, args.requests)
+                medians[mode] = median
+                print(f'{name:<18}{mode:<10}{median:>10.3f}{p95:>10.3f}')
+            print(f'{name:<18}{"saved":<10}{medians["http"] - medians["embedded"]:>10.3f}')
+    finally:
+        server.shutdown()
+
+if __name__ == '__main__':
+    main()
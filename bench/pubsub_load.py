@@ -0,0 +1,71 @@
+# pubsub_load.py - Load test for the application status stream broker
+#
+# Opens many idle subscriptions on pubsub.Broker, the way the SSE endpoint
+# does for each connected seeker, and reports memory per subscriber and how
+# long a fan-out of one event per subscriber takes. With --waiting N, N of
+# the subscribers are blocked in get() on their own thread, like streams
+# parked between keepalives, and the time until all of them have woken up
+# with their event is reported too. Needs no database:
+#
+#     python bench/pubsub_load.py --subscribers 10000 --waiting 500
+
+import argparse
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from pubsub import Broker
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the in-process pub/sub broker')
+    parser.add_argument('--subscribers', type=int, default=10000)
+    parser.add_argument('--keys', type=int, default=5000, help='distinct seekers the subscribers belong to')
+    parser.add_argument('--waiting', type=int, default=0, help='subscribers blocked in get() on a thread')
+    args = parser.parse_args()
+
+    broker = Broker()
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    subscriptions = [broker.subscribe(i % args.keys) for i in range(args.subscribers)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(f'subscribers:            {broker.metrics()["subscribers"]}')
+    print(f'memory per subscriber:  {(after - before) / args.subscribers:.0f} bytes')
+
+    woken = threading.Barrier(args.waiting + 1) if args.waiting else None
+    def wait(subscription):
+        subscription.get(timeout=30)
+        woken.wait()
+
+    waiters = [threading.Thread(target=wait, args=(subscriptions[i],), daemon=True)
+               for i in range(min(args.waiting, args.subscribers))]
+    for thread in waiters:
+        thread.start()
+    time.sleep(0.5)
+
+    started = time.perf_counter()
+    for key in range(args.keys):
+        broker.publish(key, {'application_id': key, 'status': 'shortlisted'})
+    published = time.perf_counter() - started
+    if woken:
+        woken.wait()
+    delivered = time.perf_counter() - started
+
+    metrics = broker.metrics()
+    print(f'deliveries:             {metrics["delivered"]} ({metrics["dropped"]} dropped)')
+    print(f'fan-out publish time:   {published * 1000:.1f} ms')
+    if woken:
+        print(f'all {len(waiters)} waiters woken: {delivered * 1000:.1f} ms')
+
+    for subscription in subscriptions:
+        subscription.close()
+    print(f'subscribers after close: {broker.metrics()["subscribers"]}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+# coalesce.py - Single-flight coalescing and short-lived caching of reads
+#
+# Concurrent requests for the same key share one in-flight load and its
+# serialized result instead of each running the same query. Results stay
+# fresh for `ttl` seconds; after that they are served stale for up to
+# `stale_ttl` more seconds while a single background load refreshes them.
+
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class _Call:
+    __slots__ = ('done', 'value', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+class SingleFlight:
+    def __init__(self, ttl=2.0, stale_ttl=30.0):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._cache = {}
+        self._counts = {'requests': 0, 'hits': 0, 'stale': 0, 'coalesced': 0, 'executed': 0, 'errors': 0}
+
+    def do(self, key, load):
+        now = time.monotonic()
+        with self._lock:
+            self._counts['requests'] += 1
+            cached = self._cache.get(key)
+            if cached and now < cached[1]:
+                self._counts['hits'] += 1
+                return cached[0]
+
+            call = self._calls.get(key)
+            if cached and now < cached[2]:
+                # Serve the stale value and refresh it in the background,
+                # unless a load for this key is already running
+                self._counts['stale'] += 1
+                if call is None:
+                    call = self._start(key)
+                    threading.Thread(target=self._run, args=(key, call, load), daemon=True).start()
+                return cached[0]
+
+            if call is not None:
+                self._counts['coalesced'] += 1
+                leader = False
+            else:
+                call = self._start(key)
+                leader = True
+
+        if leader:
+            self._run(key, call, load)
+        else:
+            call.done.wait()
+
+        if call.error is not None:
+            raise call.error
+        return call.value
+
+    # Drop cached values and forget in-flight loads, so the next request for
+    # these keys reads current data
+    def invalidate(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._cache.pop(key, None)
+                self._calls.pop(key, None)
+
+    def metrics(self):
+        with self._lock:
+            result = dict(self._counts)
+            result['in_flight'] = len(self._calls)
+            result['cached'] = len(self._cache)
+        result['coalescing_ratio'] = round(result['requests'] / result['executed'], 3) if result['executed'] else 0.0
+        return result
+
+    def _start(self, key):
+        call = _Call()
+        self._calls[key] = call
+        self._counts['executed'] += 1
+        return call
+
+    def _run(self, key, call, load):
+        try:
+            call.value = load()
+        except Exception as err:
+            call.error = err
+            logger.exception('Load for %r failed', key)
+
+        finished = time.monotonic()
+        with self._lock:
+            # Only the current load for a key may publish its result; one
+            # superseded by invalidate() must not overwrite newer data
+            if self._calls.get(key) is call:
+                del self._calls[key]
+                if call.error is None:
+                    self._cache[key] = (call.value, finished + self.ttl, finished + self.ttl + self.stale_ttl)
+                else:
+                    self._counts['errors'] += 1
+        call.done.set()
@@ -1,16 +1,23 @@
 # frontend.py - Flask Frontend for Job Portal
 
-from flask import Flask, render_template, request, redirect, url_for, flash, session
-import requests
+from flask import Flask, Response, render_template, request, redirect, url_for, flash, session
 import json
 import os
+from api_client import HttpClient, EmbeddedClient
+import http_cache
 
 app = Flask(__name__)
 app.secret_key = 'frontend_secret_key'
+http_cache.init_app(app, private=True)
 
 # API base URL
 API_URL = 'http://localhost:5000/api'
 
+# Set API_MODE=embedded on single-host deployments to call the backend
+# in-process instead of over HTTP
+API_MODE = os.environ.get('API_MODE', 'http')
+api = EmbeddedClient() if API_MODE == 'embedded' else HttpClient(API_URL)
+
 # Create templates directory if it doesn't exist
 if not os.path.exists('templates'):
     os.makedirs('templates')
@@ -304,12 +311,55 @@ with open('templates/register.html', 'w') as f:
     {% endblock %}
     ''')
 
+# My applications template. Status changes are pushed over the stream
+# proxied by my_applications_stream(), so the page never needs reloading.
+with open('templates/my_applications.html', 'w') as f:
+    f.write('''
+    {% extends 'base.html' %}
+    
+    {% block title %}My Applications - Job Portal{% endblock %}
+    
+    {% block content %}
+        <h2>My Applications</h2>
+        
+        {% if applications %}
+            {% for application in applications %}
+                <div class="job-card" data-application-id="{{ application.application_id }}">
+                    <h3 class="job-title">{{ application.job_title }}</h3>
+                    <p class="company-name">{{ application.company_name }}</p>
+                    <div class="job-details">
+                        <p><strong>Location:</strong> {{ application.location }}</p>
+                        <p><strong>Type:</strong> {{ application.job_type }}</p>
+                        <p><strong>Applied on:</strong> {{ application.application_date }}</p>
+                        <p><strong>Status:</strong> <span class="application-status">{{ application.status }}</span></p>
+                    </div>
+                </div>
+            {% endfor %}
+        {% else %}
+            <p>You haven't applied for any jobs yet.</p>
+        {% endif %}
+        
+        <script>
+            if (window.EventSource) {
+                var source = new EventSource("{{ url_for('my_applications_stream') }}");
+                source.addEventListener('status', function(event) {
+                    var change = JSON.parse(event.data);
+                    var card = document.querySelector('[data-application-id="' + change.application_id + '"]');
+                    if (card) {
+                        card.querySelector('.application-status').textContent = change.status;
+                    }
+                });
+            }
+        </script>
+    {% endblock %}
+    ''')
+
 # Job details template
 # Routes for the frontend application
 
 @app.route('/')
 def index():
-    response = requests.get(f'{API_URL}/jobs')
+    response = api.get('/jobs')
     jobs = response.json() if response.status_code == 200 else []
     return render_template('index.html', jobs=jobs)
 
@@ -319,7 +369,7 @@ def login():
         username = request.form['username']
         password = request.form['password']
         
-        response = requests.post(f'{API_URL}/login', json={
+        response = api.post('/login', json={
             'username': username,
             'password': password
         })
@@ -352,7 +402,7 @@ def register():
         elif data['user_type'] == 'employer':
             data['company_name'] = request.form['company_name']
         
-        response = requests.post(f'{API_URL}/register', json=data)
+        response = api.post('/register', json=data)
         
         if response.status_code == 201:
             flash('Registration successful! Please login.', 'success')
@@ -365,7 +415,7 @@ def register():
 
 @app.route('/job/<int:job_id>')
 def job_details(job_id):
-    response = requests.get(f'{API_URL}/jobs/{job_id}')
+    response = api.get(f'/jobs/{job_id}')
     if response.status_code == 200:
         job = response.json()
         return render_template('job_details.html', job=job)
@@ -381,11 +431,9 @@ def apply_job(job_id):
     
     cover_letter = request.form.get('cover_letter', '')
     
-    response = requests.post(f'{API_URL}/applications', json={
+    response = api.post('/applications', json={
         'job_id': job_id,
         'cover_letter': cover_letter
-    }, headers={
-        'Authorization': f'Bearer {session.get("user_id")}'
     })
     
     if response.status_code == 201:
@@ -403,7 +451,7 @@ def my_applications():
         return redirect(url_for('login'))
     
     # Add code to get profile_id
-    profile_response = requests.get(f'{API_URL}/profile/seeker/{session["user_id"]}')
+    profile_response = api.get(f'/profile/seeker/{session["user_id"]}')
     if profile_response.status_code != 200:
         flash('Failed to retrieve your profile.', 'error')
         return redirect(url_for('index'))
@@ -411,14 +459,35 @@ def my_applications():
     profile = profile_response.json()
     profile_id = profile['profile_id']
     
-    response = requests.get(f'{API_URL}/applications/seeker/{profile_id}', headers={
-        'Authorization': f'Bearer {session.get("user_id")}'
-    })
+    response = api.get(f'/applications/seeker/{profile_id}')
     
     applications = response.json() if response.status_code == 200 else []
     
     return render_template('my_applications.html', applications=applications)
 
+# Relays the backend's status stream to the browser. The browser can't call the
+# backend directly, since its backend session only lives in our session.
+@app.route('/my-applications/stream')
+def my_applications_stream():
+    if not session.get('user_id') or session.get('user_type') != 'seeker':
+        return Response(status=403)
+    
+    upstream = api.stream('/me/applications/stream')
+    if upstream.status_code != 200:
+        upstream.close()
+        return Response(status=upstream.status_code)
+    
+    def relay():
+        try:
+            yield from upstream
+        finally:
+            upstream.close()
+    
+    return Response(relay(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
 @app.route('/post-job', methods=['GET', 'POST'])
 def post_job():
     if not session.get('user_id') or session.get('user_type') != 'employer':
@@ -434,9 +503,7 @@ def post_job():
             'job_type': request.form['job_type']
         }
         
-        response = requests.post(f'{API_URL}/jobs', json=job_data, headers={
-            'Authorization': f'Bearer {session.get("user_id")}'
-        })
+        response = api.post('/jobs', json=job_data)
         
         if response.status_code == 201:
             flash('Job posted successfully!', 'success')
@@ -454,7 +521,7 @@ def manage_jobs():
         return redirect(url_for('login'))
     
     # Get company_id first
-    company_response = requests.get(f'{API_URL}/profile/employer/{session["user_id"]}')
+    company_response = api.get(f'/profile/employer/{session["user_id"]}')
     if company_response.status_code != 200:
         flash('Failed to retrieve your company profile.', 'error')
         return redirect(url_for('index'))
@@ -462,9 +529,7 @@ def manage_jobs():
     company = company_response.json()
     company_id = company['company_id']
     
-    response = requests.get(f'{API_URL}/jobs/company/{company_id}', headers={
-        'Authorization': f'Bearer {session.get("user_id")}'
-    })
+    response = api.get(f'/jobs/company/{company_id}')
     
     jobs = response.json() if response.status_code == 200 else []
     
@@ -0,0 +1,98 @@
+# http_cache.py - Response compression and conditional GET for both apps
+#
+# init_app() registers an after_request hook that gives every buffered GET
+# response a weak ETag (unless the view already set one), answers matching
+# If-None-Match requests with 304, and compresses the rest with brotli or
+# gzip depending on Accept-Encoding. The ETag is a hash of the body, so any
+# change to a listing (including a status change or a closed job, which
+# don't move its newest date) changes it. Compressed bodies are cached by
+# ETag, so hot unchanged payloads are only compressed once.
+
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = ('text/html', 'text/css', 'text/plain', 'text/csv', 'application/json', 'application/javascript')
+
+class CompressedCache:
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+def compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=5)
+    return gzip.compress(data, compresslevel=6)
+
+# Best encoding the client accepts, preferring brotli when it is installed
+def choose_encoding(accept_encodings):
+    if brotli is not None and accept_encodings['br']:
+        return 'br'
+    if accept_encodings['gzip']:
+        return 'gzip'
+    return None
+
+# private is True to mark every response private (so only the user's own
+# browser may store it), or a collection of the endpoints that are session
+# scoped
+def init_app(app, min_size=1024, private=False, cache=None):
+    cache = cache or CompressedCache()
+
+    @app.after_request
+    def finish_response(response):
+        if (request.method not in ('GET', 'HEAD') or response.status_code != 200
+                or response.direct_passthrough or response.is_streamed):
+            return response
+
+        if not response.get_etag()[0]:
+            response.set_etag(hashlib.sha1(response.get_data()).hexdigest(), weak=True)
+        if not response.cache_control:
+            # Clients and CDNs may keep the response but must revalidate it
+            response.cache_control.no_cache = True
+            if private is True or (private and request.endpoint in private):
+                response.cache_control.private = True
+
+        response.make_conditional(request)
+        if response.status_code != 200 or response.mimetype not in COMPRESSIBLE_TYPES:
+            return response
+
+        response.vary.add('Accept-Encoding')
+        data = response.get_data()
+        encoding = choose_encoding(request.accept_encodings)
+        if encoding is None or len(data) < min_size or 'Content-Encoding' in response.headers:
+            return response
+
+        key = (response.get_etag()[0], encoding)
+        compressed = cache.get(key)
+        if compressed is None:
+            compressed = compress(data, encoding)
+            cache.put(key, compressed)
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    return cache
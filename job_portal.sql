@@ -48,7 +48,12 @@ CREATE TABLE jobs (
     location VARCHAR(100),
     job_type ENUM('full-time', 'part-time', 'contract', 'internship') NOT NULL,
     posting_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    FOREIGN KEY (company_id) REFERENCES companies(company_id) ON DELETE CASCADE
+    expires_at TIMESTAMP NULL DEFAULT NULL,
+    closed_at TIMESTAMP NULL DEFAULT NULL,
+    FOREIGN KEY (company_id) REFERENCES companies(company_id) ON DELETE CASCADE,
+    INDEX idx_jobs_open (closed_at, posting_date),
+    INDEX idx_jobs_expires (expires_at, posting_date),
+    INDEX idx_jobs_company (company_id, posting_date)
 );
 
 -- Job Applications Table
@@ -60,7 +65,42 @@ CREATE TABLE applications (
     status ENUM('applied', 'under_review', 'rejected', 'shortlisted', 'selected') DEFAULT 'applied',
     cover_letter TEXT,
     FOREIGN KEY (job_id) REFERENCES jobs(job_id) ON DELETE CASCADE,
-    FOREIGN KEY (profile_id) REFERENCES seeker_profiles(profile_id) ON DELETE CASCADE
+    FOREIGN KEY (profile_id) REFERENCES seeker_profiles(profile_id) ON DELETE CASCADE,
+    INDEX idx_applications_profile (profile_id, application_date),
+    INDEX idx_applications_job (job_id, application_date)
+);
+
+-- Archive tables for closed/expired jobs and their applications. Rows are
+-- moved here in small batches by archive.py so that the hot tables above only
+-- hold live postings. MySQL does not allow foreign keys on partitioned tables,
+-- so the archive is kept as separate tables instead of range partitions.
+CREATE TABLE jobs_archive (
+    job_id INT PRIMARY KEY,
+    company_id INT NOT NULL,
+    title VARCHAR(100) NOT NULL,
+    description TEXT NOT NULL,
+    salary VARCHAR(50),
+    location VARCHAR(100),
+    job_type ENUM('full-time', 'part-time', 'contract', 'internship') NOT NULL,
+    posting_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP NULL DEFAULT NULL,
+    closed_at TIMESTAMP NULL DEFAULT NULL,
+    FOREIGN KEY (company_id) REFERENCES companies(company_id) ON DELETE CASCADE,
+    INDEX idx_jobs_archive_posting (posting_date),
+    INDEX idx_jobs_archive_company (company_id, posting_date)
+);
+
+CREATE TABLE applications_archive (
+    application_id INT PRIMARY KEY,
+    job_id INT NOT NULL,
+    profile_id INT NOT NULL,
+    application_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    status ENUM('applied', 'under_review', 'rejected', 'shortlisted', 'selected') DEFAULT 'applied',
+    cover_letter TEXT,
+    FOREIGN KEY (job_id) REFERENCES jobs_archive(job_id) ON DELETE CASCADE,
+    FOREIGN KEY (profile_id) REFERENCES seeker_profiles(profile_id) ON DELETE CASCADE,
+    INDEX idx_applications_archive_profile (profile_id, application_date),
+    INDEX idx_applications_archive_job (job_id, application_date)
 );
 
 -- Insert sample data for users
@@ -0,0 +1,49 @@
+-- Upgrade for databases created from an earlier job_portal.sql
+--
+-- Adds the job expiry/closing columns, the listing indexes and the archive
+-- tables that the backend and archive.py now expect. New databases get all
+-- of this from job_portal.sql and don't need it. Run it once:
+--
+--     mysql -u root -p < job_portal_upgrade.sql
+
+USE job_portal;
+
+ALTER TABLE jobs
+    ADD COLUMN expires_at TIMESTAMP NULL DEFAULT NULL,
+    ADD COLUMN closed_at TIMESTAMP NULL DEFAULT NULL,
+    ADD INDEX idx_jobs_open (closed_at, posting_date),
+    ADD INDEX idx_jobs_expires (expires_at, posting_date),
+    ADD INDEX idx_jobs_company (company_id, posting_date);
+
+ALTER TABLE applications
+    ADD INDEX idx_applications_profile (profile_id, application_date),
+    ADD INDEX idx_applications_job (job_id, application_date);
+
+CREATE TABLE IF NOT EXISTS jobs_archive (
+    job_id INT PRIMARY KEY,
+    company_id INT NOT NULL,
+    title VARCHAR(100) NOT NULL,
+    description TEXT NOT NULL,
+    salary VARCHAR(50),
+    location VARCHAR(100),
+    job_type ENUM('full-time', 'part-time', 'contract', 'internship') NOT NULL,
+    posting_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP NULL DEFAULT NULL,
+    closed_at TIMESTAMP NULL DEFAULT NULL,
+    FOREIGN KEY (company_id) REFERENCES companies(company_id) ON DELETE CASCADE,
+    INDEX idx_jobs_archive_posting (posting_date),
+    INDEX idx_jobs_archive_company (company_id, posting_date)
+);
+
+CREATE TABLE IF NOT EXISTS applications_archive (
+    application_id INT PRIMARY KEY,
+    job_id INT NOT NULL,
+    profile_id INT NOT NULL,
+    application_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    status ENUM('applied', 'under_review', 'rejected', 'shortlisted', 'selected') DEFAULT 'applied',
+    cover_letter TEXT,
+    FOREIGN KEY (job_id) REFERENCES jobs_archive(job_id) ON DELETE CASCADE,
+    FOREIGN KEY (profile_id) REFERENCES seeker_profiles(profile_id) ON DELETE CASCADE,
+    INDEX idx_applications_archive_profile (profile_id, application_date),
+    INDEX idx_applications_archive_job (job_id, application_date)
+);
@@ -0,0 +1,84 @@
+# pubsub.py - In-process publish/subscribe fan-out for live event streams
+#
+# Each subscriber only holds a small bounded deque and an Event, so idle
+# stream connections are cheap. Waiting uses threading primitives, which
+# gevent/eventlet monkey-patch into cooperative ones; run the backend on an
+# async worker (e.g. gunicorn -k gevent) to hold thousands of open streams.
+
+import threading
+from collections import deque
+
+
+class Subscription:
+    __slots__ = ('key', '_broker', '_events', '_ready')
+
+    def __init__(self, broker, key, max_pending):
+        self.key = key
+        self._broker = broker
+        self._events = deque(maxlen=max_pending)
+        self._ready = threading.Event()
+
+    def _push(self, event):
+        dropped = len(self._events) == self._events.maxlen
+        self._events.append(event)
+        self._ready.set()
+        return dropped
+
+    # Wait up to timeout seconds and return every event published since the
+    # last call (an empty list if nothing arrived)
+    def get(self, timeout=None):
+        if not self._events:
+            self._ready.wait(timeout)
+        self._ready.clear()
+        events = []
+        while self._events:
+            events.append(self._events.popleft())
+        return events
+
+    def close(self):
+        self._broker._unsubscribe(self)
+
+
+class Broker:
+    def __init__(self, max_pending=100):
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._subscribers = {}
+        self._counts = {'published': 0, 'delivered': 0, 'dropped': 0}
+
+    def subscribe(self, key):
+        subscription = Subscription(self, key, self.max_pending)
+        with self._lock:
+            self._subscribers.setdefault(key, set()).add(subscription)
+        return subscription
+
+    def publish(self, key, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(key, ()))
+            self._counts['published'] += 1
+
+        dropped = 0
+        for subscription in subscribers:
+            if subscription._push(event):
+                dropped += 1
+
+        with self._lock:
+            self._counts['delivered'] += len(subscribers)
+            self._counts['dropped'] += dropped
+        return len(subscribers)
+
+    def metrics(self):
+        with self._lock:
+            result = dict(self._counts)
+            result['keys'] = len(self._subscribers)
+            result['subscribers'] = sum(len(subs) for subs in self._subscribers.values())
+        return result
+
+    def _unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.key)
+            if subscribers is None:
+                return
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.key]
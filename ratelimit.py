@@ -0,0 +1,181 @@
+# ratelimit.py - Per-client rate limiting and admission control for DB work
+#
+# RateLimiter applies token buckets keyed on route and client (session user
+# or IP). Buckets live in process memory by default; pass a RedisStore to
+# share them between processes and hosts (if Redis goes away, limits fall
+# back to per-process buckets until it returns). Admission caps how many
+# requests may do DB work at once, queues a bounded number of extra requests
+# for a short time and rejects the rest straight away, so an overloaded
+# backend sheds load instead of exhausting MySQL connections.
+
+import logging
+import math
+import threading
+import time
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+class Overloaded(Exception):
+    pass
+
+class MemoryStore:
+    def __init__(self, purge_interval=60.0):
+        self.purge_interval = purge_interval
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._next_purge = time.monotonic() + purge_interval
+
+    # Take one token from the bucket. Returns 0 if allowed, otherwise the
+    # number of seconds until a token will be available.
+    def consume(self, key, rate, burst):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                retry_after = 0
+            else:
+                self._buckets[key] = (tokens, now)
+                retry_after = (1 - tokens) / rate
+
+            if now >= self._next_purge:
+                self._purge(now)
+        return retry_after
+
+    # Buckets idle long enough to have refilled carry no state worth keeping
+    def _purge(self, now):
+        self._buckets = {key: value for key, value in self._buckets.items()
+                         if now - value[1] < self.purge_interval}
+        self._next_purge = now + self.purge_interval
+
+class RedisStore:
+    # Refill and take a token atomically on the Redis server
+    SCRIPT = '''
+        local burst = tonumber(ARGV[2])
+        local rate = tonumber(ARGV[1])
+        local now = tonumber(ARGV[3])
+        local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+        local tokens = tonumber(bucket[1]) or burst
+        local updated = tonumber(bucket[2]) or now
+        tokens = math.min(burst, tokens + (now - updated) * rate)
+        local retry_after = 0
+        if tokens >= 1 then
+            tokens = tokens - 1
+        else
+            retry_after = (1 - tokens) / rate
+        end
+        redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+        redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+        return tostring(retry_after)
+    '''
+
+    def __init__(self, url, prefix='ratelimit:', timeout=0.5):
+        if redis is None:
+            raise RuntimeError('The redis package is required for RedisStore')
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url, socket_timeout=timeout, socket_connect_timeout=timeout)
+        self._script = self._client.register_script(self.SCRIPT)
+        # Used while Redis is unreachable, so an outage degrades limits to
+        # per-process instead of failing every request
+        self._fallback = MemoryStore()
+        self._failing = False
+
+    def consume(self, key, rate, burst):
+        try:
+            retry_after = float(self._script(keys=[self.prefix + key], args=[rate, burst, time.time()]))
+        except redis.RedisError:
+            if not self._failing:
+                logger.warning('Rate limit store unavailable, using per-process limits', exc_info=True)
+                self._failing = True
+            return self._fallback.consume(key, rate, burst)
+        if self._failing:
+            logger.info('Rate limit store recovered')
+            self._failing = False
+        return retry_after
+
+class RateLimiter:
+    # rules maps a route name to (tokens per second, burst size); routes
+    # without a rule use default
+    def __init__(self, store=None, default=(20, 40), rules=None):
+        self.store = store or MemoryStore()
+        self.default = default
+        self.rules = rules or {}
+        self._lock = threading.Lock()
+        self._counts = {'allowed': 0, 'limited': 0}
+
+    # Returns 0 if the request may proceed, otherwise the whole number of
+    # seconds the client should wait (for Retry-After)
+    def check(self, route, client):
+        rate, burst = self.rules.get(route, self.default)
+        retry_after = self.store.consume(f'{route}:{client}', rate, burst)
+        with self._lock:
+            self._counts['limited' if retry_after else 'allowed'] += 1
+        return math.ceil(retry_after)
+
+    def metrics(self):
+        with self._lock:
+            return dict(self._counts)
+
+class Admission:
+    def __init__(self, max_concurrent=20, max_queue=50, timeout=2.0):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._cond = threading.Condition()
+        self._active = 0
+        self._waiting = 0
+        self._counts = {'admitted': 0, 'queued': 0, 'rejected': 0, 'timed_out': 0}
+
+    # Returns True once a slot is held, False if the queue is full or no slot
+    # freed up within the timeout
+    def acquire(self):
+        with self._cond:
+            if self._active < self.max_concurrent:
+                self._active += 1
+                self._counts['admitted'] += 1
+                return True
+            if self._waiting >= self.max_queue:
+                self._counts['rejected'] += 1
+                return False
+
+            self._waiting += 1
+            self._counts['queued'] += 1
+            deadline = time.monotonic() + self.timeout
+            try:
+                while self._active >= self.max_concurrent:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._counts['timed_out'] += 1
+                        return False
+                    self._cond.wait(remaining)
+                self._active += 1
+                self._counts['admitted'] += 1
+                return True
+            finally:
+                self._waiting -= 1
+
+    def release(self):
+        with self._cond:
+            self._active -= 1
+            self._cond.notify()
+
+    def __enter__(self):
+        if not self.acquire():
+            raise Overloaded()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    def metrics(self):
+        with self._cond:
+            result = dict(self._counts)
+            result['active'] = self._active
+            result['waiting'] = self._waiting
+        return result
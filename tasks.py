@@ -0,0 +1,329 @@
+# tasks.py - In-process background task queue for the Job Portal backend
+#
+# Side effects that don't need to block a request (notification emails,
+# search-index updates, counter refreshes) are enqueued here once the
+# request's transaction has committed and are run by a small worker pool.
+# Tasks live in memory by default; pass a SQLiteBackend to keep them across
+# restarts on a single host, shared by all of its worker processes.
+
+import heapq
+import itertools
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryBackend:
+    # Tasks are kept in one heap per task name, ordered by the time they
+    # become runnable, so delayed retries simply sit behind the tasks that are
+    # ready now and a batch of one kind never has to step over the others.
+    def __init__(self):
+        self._heaps = {}
+        self._size = 0
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+    def put(self, task):
+        with self._cond:
+            heap = self._heaps.setdefault(task['name'], [])
+            heapq.heappush(heap, (task['run_at'], next(self._seq), task))
+            self._size += 1
+            self._cond.notify()
+
+    def take(self, batch_size, timeout):
+        deadline = time.time() + timeout
+        with self._cond:
+            while True:
+                now = time.time()
+                heap = self._next_heap()
+                if heap and heap[0][0] <= now:
+                    break
+                if now >= deadline:
+                    return []
+                wait = deadline - now
+                if heap:
+                    wait = min(wait, heap[0][0] - now)
+                self._cond.wait(wait)
+
+            # Take the earliest ready task plus any other ready tasks of the
+            # same kind, so handlers can process them in one go
+            batch = []
+            while heap and len(batch) < batch_size and heap[0][0] <= now:
+                batch.append(heapq.heappop(heap)[2])
+            self._size -= len(batch)
+            return batch
+
+    # The heap whose first task becomes runnable soonest. There is one heap per
+    # registered handler, so this scan stays short.
+    def _next_heap(self):
+        heaps = [heap for heap in self._heaps.values() if heap]
+        return min(heaps, key=lambda heap: heap[0][:2]) if heaps else None
+
+    def ack(self, tasks):
+        pass
+
+    def depth(self):
+        with self._cond:
+            return self._size
+
+
+class SQLiteBackend:
+    # Durable local backend that several processes may share. Taking a task
+    # leases it to this backend instance; it is only deleted once handled, and
+    # a lease that runs out (the owning process died mid-task) lets any
+    # process take the task again.
+    def __init__(self, path, poll_interval=0.5, lease=300.0):
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self.owner = uuid.uuid4().hex
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._conn = sqlite3.connect(path, timeout=10.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS tasks (
+                task_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                enqueued_at REAL NOT NULL,
+                run_at REAL NOT NULL,
+                claimed_by TEXT,
+                lease_until REAL NOT NULL DEFAULT 0
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_tasks_ready ON tasks (lease_until, run_at)')
+
+    def put(self, task):
+        with self._cond:
+            self._conn.execute(
+                'INSERT INTO tasks (name, payload, attempts, enqueued_at, run_at) VALUES (?, ?, ?, ?, ?)',
+                (task['name'], json.dumps(task['payload']), task['attempts'],
+                 task['enqueued_at'], task['run_at']))
+            self._cond.notify()
+
+    def take(self, batch_size, timeout):
+        deadline = time.time() + timeout
+        with self._cond:
+            while True:
+                rows = self._claim(batch_size)
+                if rows:
+                    break
+                if time.time() >= deadline:
+                    return []
+                self._cond.wait(min(self.poll_interval, deadline - time.time()))
+
+        return [{
+            'id': row[0],
+            'name': row[1],
+            'payload': json.loads(row[2]),
+            'attempts': row[3],
+            'enqueued_at': row[4],
+            'run_at': row[5]
+        } for row in rows]
+
+    # Lease the first ready task and other ready tasks of the same kind. The
+    # write lock taken by BEGIN IMMEDIATE keeps other processes from leasing
+    # the same rows.
+    def _claim(self, batch_size):
+        now = time.time()
+        self._conn.execute('BEGIN IMMEDIATE')
+        try:
+            first = self._conn.execute(
+                'SELECT name FROM tasks WHERE lease_until < ? AND run_at <= ? ORDER BY run_at LIMIT 1',
+                (now, now)).fetchone()
+            if not first:
+                self._conn.execute('COMMIT')
+                return []
+
+            rows = self._conn.execute('''
+                SELECT task_id, name, payload, attempts, enqueued_at, run_at
+                FROM tasks
+                WHERE lease_until < ? AND run_at <= ? AND name = ?
+                ORDER BY run_at
+                LIMIT ?
+            ''', (now, now, first[0], batch_size)).fetchall()
+            ids = [row[0] for row in rows]
+            self._conn.execute(
+                'UPDATE tasks SET claimed_by = ?, lease_until = ? WHERE task_id IN (%s)' % ','.join('?' * len(ids)),
+                [self.owner, now + self.lease] + ids)
+            self._conn.execute('COMMIT')
+            return rows
+        except Exception:
+            self._conn.execute('ROLLBACK')
+            raise
+
+    def ack(self, tasks):
+        ids = [task['id'] for task in tasks]
+        if not ids:
+            return
+        with self._cond:
+            self._conn.execute(
+                'DELETE FROM tasks WHERE claimed_by = ? AND task_id IN (%s)' % ','.join('?' * len(ids)),
+                [self.owner] + ids)
+
+    def depth(self):
+        with self._cond:
+            return self._conn.execute('SELECT COUNT(*) FROM tasks').fetchone()[0]
+
+
+class TaskQueue:
+    def __init__(self, backend=None, workers=4, batch_size=50, max_attempts=5,
+                 backoff=1.0, max_backoff=300.0):
+        self.backend = backend or MemoryBackend()
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        self._handlers = {}
+        self._threads = []
+        self._running = False
+        self._start_lock = threading.Lock()
+
+        self._stats_lock = threading.Lock()
+        self._in_flight = 0
+        self._counts = {'enqueued': 0, 'completed': 0, 'retried': 0, 'failed': 0, 'batches': 0}
+        self._wait_times = deque(maxlen=1000)
+        self._run_times = deque(maxlen=1000)
+
+    # Register a handler. Batch handlers receive a list of payloads, others
+    # are called once per payload.
+    def task(self, name, batch=False):
+        def decorator(func):
+            self._handlers[name] = (func, batch)
+            return func
+        return decorator
+
+    def enqueue(self, name, payload=None, delay=0):
+        if name not in self._handlers:
+            raise ValueError(f'No handler registered for task {name}')
+
+        now = time.time()
+        self.backend.put({
+            'name': name,
+            'payload': payload if payload is not None else {},
+            'attempts': 0,
+            'enqueued_at': now,
+            'run_at': now + delay
+        })
+        with self._stats_lock:
+            self._counts['enqueued'] += 1
+
+        # Workers are started lazily so that importing the app (or the debug
+        # reloader's parent process) doesn't spawn threads. A process that
+        # serves requests should call start() itself, so tasks a durable
+        # backend kept from an earlier run are resumed without waiting for
+        # the next enqueue.
+        self.start()
+
+    def start(self):
+        if self._running:
+            return
+        with self._start_lock:
+            if self._running:
+                return
+            self._running = True
+            self._threads = []
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f'task-worker-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, timeout=5.0):
+        with self._start_lock:
+            self._running = False
+            threads, self._threads = self._threads, []
+        for thread in threads:
+            thread.join(timeout)
+
+    def metrics(self):
+        with self._stats_lock:
+            wait_times = sorted(self._wait_times)
+            run_times = sorted(self._run_times)
+            result = dict(self._counts)
+            result['in_flight'] = self._in_flight
+
+        result['depth'] = self.backend.depth()
+        result['workers'] = len(self._threads)
+        result['wait_ms'] = _summarize(wait_times)
+        result['run_ms'] = _summarize(run_times)
+        return result
+
+    def _work(self):
+        while self._running:
+            try:
+                batch = self.backend.take(self.batch_size, timeout=1.0)
+            except Exception:
+                logger.exception('Failed to fetch tasks from the queue backend')
+                time.sleep(1.0)
+                continue
+
+            if batch:
+                self._run_batch(batch)
+
+    def _run_batch(self, batch):
+        func, is_batch = self._handlers[batch[0]['name']]
+        started = time.time()
+        with self._stats_lock:
+            self._in_flight += len(batch)
+            self._counts['batches'] += 1
+            for task in batch:
+                self._wait_times.append((started - task['enqueued_at']) * 1000)
+
+        failed = []
+        if is_batch:
+            try:
+                func([task['payload'] for task in batch])
+            except Exception:
+                logger.exception('Task batch %s failed (%d tasks)', batch[0]['name'], len(batch))
+                failed = batch
+        else:
+            for task in batch:
+                try:
+                    func(task['payload'])
+                except Exception:
+                    logger.exception('Task %s failed', task['name'])
+                    failed.append(task)
+
+        finished = time.time()
+        retried = 0
+        for task in failed:
+            attempts = task['attempts'] + 1
+            if attempts >= self.max_attempts:
+                logger.error('Giving up on task %s after %d attempts', task['name'], attempts)
+                continue
+            delay = min(self.backoff * (2 ** (attempts - 1)), self.max_backoff)
+            self.backend.put({
+                'name': task['name'],
+                'payload': task['payload'],
+                'attempts': attempts,
+                'enqueued_at': task['enqueued_at'],
+                'run_at': finished + delay
+            })
+            retried += 1
+        self.backend.ack(batch)
+
+        with self._stats_lock:
+            self._in_flight -= len(batch)
+            self._run_times.append((finished - started) * 1000)
+            self._counts['completed'] += len(batch) - len(failed)
+            self._counts['retried'] += retried
+            self._counts['failed'] += len(failed) - retried
+
+
+def _summarize(values):
+    if not values:
+        return {'avg': 0.0, 'p95': 0.0, 'max': 0.0}
+    return {
+        'avg': round(sum(values) / len(values), 3),
+        'p95': round(values[min(len(values) - 1, int(len(values) * 0.95))], 3),
+        'max': round(values[-1], 3)
+    }
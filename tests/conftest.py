@@ -0,0 +1,21 @@
+import os
+import sys
+
+import pytest
+
+# The apps are flat top-level modules; make them importable from the tests
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# The backend app with fresh coalescing, rate limit and admission state, so
+# tests neither share cached reads nor run into each other's limits. Requests
+# start the task workers, so they are stopped again afterwards.
+@pytest.fixture
+def backend(monkeypatch):
+    import app as backend
+    from coalesce import SingleFlight
+    from ratelimit import Admission, RateLimiter
+    monkeypatch.setattr(backend, 'read_coalescer', SingleFlight(ttl=2.0, stale_ttl=30.0))
+    monkeypatch.setattr(backend, 'rate_limiter', RateLimiter(default=(1e9, 1e9)))
+    monkeypatch.setattr(backend, 'db_admission', Admission())
+    yield backend
+    backend.task_queue.stop()
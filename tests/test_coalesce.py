@@ -0,0 +1,180 @@
+import threading
+import time
+
+import pytest
+
+from coalesce import SingleFlight
+
+def parallel(count, func):
+    barrier = threading.Barrier(count)
+    results = []
+    def run():
+        barrier.wait()
+        results.append(func())
+    threads = [threading.Thread(target=run) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+class CountingLoad:
+    def __init__(self, delay=0.1):
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+            value = f'body-{self.calls}'
+        time.sleep(self.delay)
+        return value
+
+def test_parallel_identical_reads_run_one_query():
+    flight = SingleFlight(ttl=5.0)
+    load = CountingLoad()
+
+    results = parallel(100, lambda: flight.do(('jobs', False), load))
+
+    assert load.calls == 1
+    assert results == ['body-1'] * 100
+    metrics = flight.metrics()
+    assert metrics['executed'] == 1
+    assert metrics['coalesced'] == 99
+    assert metrics['coalescing_ratio'] == 100.0
+
+def test_different_keys_are_not_coalesced():
+    flight = SingleFlight(ttl=5.0)
+    load = CountingLoad(delay=0.01)
+
+    flight.do(('jobs', False), load)
+    flight.do(('jobs', True), load)
+
+    assert load.calls == 2
+
+def test_errors_are_shared_and_not_cached():
+    flight = SingleFlight(ttl=5.0)
+    calls = []
+    def failing():
+        calls.append(1)
+        time.sleep(0.05)
+        raise RuntimeError('db down')
+
+    errors = parallel(20, lambda: pytest.raises(RuntimeError, flight.do, 'key', failing))
+
+    assert len(errors) == 20
+    assert len(calls) == 1
+    assert flight.do('key', lambda: 'ok') == 'ok'
+
+def test_stale_value_is_served_while_one_refresh_runs():
+    flight = SingleFlight(ttl=0.05, stale_ttl=5.0)
+    load = CountingLoad(delay=0.2)
+    assert flight.do('key', load) == 'body-1'
+    time.sleep(0.1)
+
+    results = parallel(50, lambda: flight.do('key', load))
+
+    assert results == ['body-1'] * 50
+    time.sleep(0.3)
+    assert load.calls == 2
+    assert flight.metrics()['stale'] == 50
+    assert flight.do('key', load) == 'body-2'
+
+def test_expired_value_is_reloaded():
+    flight = SingleFlight(ttl=0.01, stale_ttl=0.01)
+    load = CountingLoad(delay=0)
+    flight.do('key', load)
+    time.sleep(0.05)
+
+    assert flight.do('key', load) == 'body-2'
+
+def test_invalidate_forces_a_fresh_load():
+    flight = SingleFlight(ttl=5.0)
+    load = CountingLoad(delay=0)
+    flight.do('key', load)
+
+    flight.invalidate('key')
+
+    assert flight.do('key', load) == 'body-2'
+
+def test_load_superseded_by_invalidate_does_not_overwrite_newer_data():
+    flight = SingleFlight(ttl=5.0)
+    started = threading.Event()
+    release = threading.Event()
+    def slow():
+        started.set()
+        release.wait()
+        return 'old'
+
+    thread = threading.Thread(target=flight.do, args=('key', slow))
+    thread.start()
+    started.wait()
+    flight.invalidate('key')
+    assert flight.do('key', lambda: 'new') == 'new'
+    release.set()
+    thread.join()
+
+    assert flight.do('key', lambda: 'unused') == 'new'
+
+# The same through the backend's routes, with the query functions replaced so
+# no MySQL is needed
+
+class CountingQuery:
+    def __init__(self, result, delay=0.1):
+        self.result = result
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, *args):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return self.result
+
+def get_in_parallel(backend, count, path):
+    def get():
+        return backend.app.test_client(use_cookies=False).get(path)
+    return parallel(count, get)
+
+def test_parallel_job_listing_requests_run_one_query(backend, monkeypatch):
+    query = CountingQuery([{'job_id': 1, 'title': 'Python Developer'}, {'job_id': 2, 'title': 'DBA'}])
+    monkeypatch.setattr(backend, 'query_jobs', query)
+
+    responses = get_in_parallel(backend, 50, '/api/jobs')
+
+    assert query.calls == 1
+    assert {response.status_code for response in responses} == {200}
+    assert len({response.get_data() for response in responses}) == 1
+    assert len({response.headers['ETag'] for response in responses}) == 1
+    assert responses[0].get_json()[0]['title'] == 'Python Developer'
+    # Only the shared load took a DB admission slot, and gave it back
+    admission = backend.db_admission.metrics()
+    assert admission['admitted'] == 1
+    assert admission['active'] == 0
+
+def test_parallel_profile_requests_run_one_query(backend, monkeypatch):
+    query = CountingQuery({'profile_id': 1, 'user_id': 1, 'first_name': 'Rajesh'})
+    monkeypatch.setattr(backend, 'query_profile', query)
+
+    responses = get_in_parallel(backend, 50, '/api/profile/seeker/1')
+
+    assert query.calls == 1
+    assert {response.status_code for response in responses} == {200}
+    assert {response.get_json()['first_name'] for response in responses} == {'Rajesh'}
+    assert backend.db_admission.metrics()['admitted'] == 1
+
+def test_invalidated_listing_is_reloaded_with_a_new_etag(backend, monkeypatch):
+    query = CountingQuery([], delay=0)
+    monkeypatch.setattr(backend, 'query_jobs', query)
+    client = backend.app.test_client()
+    first = client.get('/api/jobs')
+    assert client.get('/api/jobs').headers['ETag'] == first.headers['ETag']
+    assert query.calls == 1
+
+    query.result = [{'job_id': 1, 'title': 'Python Developer'}]
+    backend.read_coalescer.invalidate(('jobs', False))
+
+    assert client.get('/api/jobs').headers['ETag'] != first.headers['ETag']
+    assert query.calls == 2
@@ -0,0 +1,168 @@
+import logging
+import threading
+import time
+import types
+
+import pytest
+from flask import Flask
+
+import api_client
+import ratelimit
+from ratelimit import Admission, MemoryStore, RateLimiter, RedisStore
+
+def test_burst_is_allowed_then_limited():
+    limiter = RateLimiter(default=(1, 3))
+
+    assert [limiter.check('get_jobs', '10.0.0.1') for _ in range(4)] == [0, 0, 0, 1]
+    # Other clients and routes have their own buckets
+    assert limiter.check('get_jobs', '10.0.0.2') == 0
+    assert limiter.check('get_job', '10.0.0.1') == 0
+    assert limiter.metrics() == {'allowed': 5, 'limited': 1}
+
+def test_tokens_refill_over_time():
+    store = MemoryStore()
+    assert store.consume('key', 20, 1) == 0
+    retry_after = store.consume('key', 20, 1)
+    assert 0 < retry_after <= 0.05
+
+    time.sleep(0.06)
+
+    assert store.consume('key', 20, 1) == 0
+
+def test_idle_buckets_are_purged():
+    store = MemoryStore(purge_interval=0.05)
+    for n in range(100):
+        store.consume(f'client-{n}', 1, 5)
+    time.sleep(0.06)
+
+    store.consume('client-new', 1, 5)
+
+    assert list(store._buckets) == ['client-new']
+
+class FakeRedis:
+    class RedisError(Exception):
+        pass
+
+    def __init__(self):
+        self.up = False
+        self.Redis = self
+
+    def from_url(self, url, **kwargs):
+        return self
+
+    def register_script(self, script):
+        def run(keys, args):
+            if not self.up:
+                raise self.RedisError('Connection refused')
+            return '0'
+        return run
+
+def test_redis_errors_fall_back_to_memory_buckets(monkeypatch, caplog):
+    caplog.set_level(logging.INFO, logger='ratelimit')
+    fake = FakeRedis()
+    monkeypatch.setattr(ratelimit, 'redis', fake)
+    limiter = RateLimiter(store=RedisStore('redis://localhost'), default=(1, 2))
+
+    # Redis is down: requests are still limited, per process
+    assert [limiter.check('get_jobs', 'client') for _ in range(3)] == [0, 0, 1]
+    assert caplog.text.count('Rate limit store unavailable') == 1
+
+    fake.up = True
+    assert limiter.check('get_jobs', 'client') == 0
+    assert 'Rate limit store recovered' in caplog.text
+
+def test_admission_rejects_when_the_queue_is_full():
+    admission = Admission(max_concurrent=1, max_queue=0)
+    assert admission.acquire()
+
+    assert not admission.acquire()
+    assert admission.metrics()['rejected'] == 1
+    admission.release()
+    assert admission.metrics()['active'] == 0
+
+def test_admission_times_out_waiting_for_a_slot():
+    admission = Admission(max_concurrent=1, max_queue=5, timeout=0.05)
+    admission.acquire()
+
+    started = time.time()
+    assert not admission.acquire()
+    assert time.time() - started >= 0.05
+    metrics = admission.metrics()
+    assert metrics['queued'] == 1
+    assert metrics['timed_out'] == 1
+    assert metrics['waiting'] == 0
+
+def test_queued_request_gets_the_released_slot():
+    admission = Admission(max_concurrent=1, max_queue=5, timeout=2.0)
+    admission.acquire()
+    threading.Timer(0.05, admission.release).start()
+
+    assert admission.acquire()
+    assert admission.metrics()['admitted'] == 2
+
+def test_limited_requests_get_429_with_retry_after(backend, monkeypatch):
+    monkeypatch.setattr(backend, 'rate_limiter', RateLimiter(rules={'get_jobs': (0.5, 2)}))
+    monkeypatch.setattr(backend, 'query_jobs', lambda include_history: [])
+    client = backend.app.test_client()
+
+    statuses = [client.get('/api/jobs').status_code for _ in range(3)]
+
+    assert statuses == [200, 200, 429]
+    response = client.get('/api/jobs')
+    assert response.headers['Retry-After'] == '2'
+
+def test_overloaded_backend_answers_503(backend, monkeypatch):
+    monkeypatch.setattr(backend, 'db_admission', Admission(max_concurrent=0, max_queue=0))
+
+    response = backend.app.test_client().get('/api/jobs/company/1')
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+    assert backend.db_admission.metrics()['rejected'] == 1
+
+@pytest.mark.parametrize('remote_addr, forwarded, expected', [
+    ('127.0.0.1', '203.0.113.7', '203.0.113.7'),
+    # Only the rightmost untrusted hop counts; the client can prepend anything
+    ('127.0.0.1', 'spoofed, 203.0.113.7, 127.0.0.1', '203.0.113.7'),
+    # Untrusted peers can't choose their address at all
+    ('198.51.100.2', '203.0.113.7', '198.51.100.2'),
+    ('127.0.0.1', None, '127.0.0.1'),
+    ('127.0.0.1', '::1, 127.0.0.1', '::1'),
+])
+def test_client_address_takes_the_rightmost_untrusted_hop(backend, remote_addr, forwarded, expected):
+    assert backend.resolve_client_address(remote_addr, forwarded) == expected
+
+def test_frontend_appends_to_the_forwarding_chain():
+    frontend = Flask(__name__)
+    with frontend.test_request_context('/', headers={'X-Forwarded-For': '203.0.113.7'},
+                                       environ_base={'REMOTE_ADDR': '10.0.0.5'}):
+        headers = api_client._outgoing_headers(None, 'session')
+
+    assert headers['X-Forwarded-For'] == '203.0.113.7, 10.0.0.5'
+
+def test_users_behind_a_trusted_proxy_get_their_own_buckets(backend, monkeypatch):
+    monkeypatch.setattr(backend, 'TRUSTED_PROXIES', {'127.0.0.1', '10.0.0.5'})
+    monkeypatch.setattr(backend, 'rate_limiter', RateLimiter(rules={'get_jobs': (0.1, 1)}))
+    monkeypatch.setattr(backend, 'query_jobs', lambda include_history: [])
+    client = backend.app.test_client(use_cookies=False)
+
+    # The frontend relays requests that nginx (10.0.0.5) forwarded to it
+    def get(user):
+        return client.get('/api/jobs', headers={'X-Forwarded-For': f'{user}, 10.0.0.5'}).status_code
+
+    assert [get('203.0.113.7'), get('203.0.113.8'), get('203.0.113.7')] == [200, 200, 429]
+
+def test_embedded_client_resolves_the_forwarding_chain_like_the_backend(backend, monkeypatch):
+    monkeypatch.setattr(backend, 'TRUSTED_PROXIES', {'127.0.0.1', '10.0.0.5'})
+    monkeypatch.setattr(backend, 'rate_limiter', RateLimiter(rules={'get_jobs': (0.1, 1)}))
+    monkeypatch.setattr(backend, 'query_jobs', lambda include_history: [])
+    client = api_client.EmbeddedClient()
+    frontend = Flask(__name__)
+    frontend.secret_key = 'test'
+
+    def get(user):
+        with frontend.test_request_context('/', headers={'X-Forwarded-For': user},
+                                           environ_base={'REMOTE_ADDR': '10.0.0.5'}):
+            return client.get('/jobs').status_code
+
+    assert [get('203.0.113.7'), get('203.0.113.8'), get('203.0.113.7')] == [200, 200, 429]
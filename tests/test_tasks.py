@@ -0,0 +1,154 @@
+import threading
+import time
+
+import pytest
+
+from tasks import MemoryBackend, SQLiteBackend, TaskQueue
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() >= deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+def make_task(name, run_at=None, **payload):
+    now = time.time()
+    return {'name': name, 'payload': payload, 'attempts': 0, 'enqueued_at': now,
+            'run_at': now if run_at is None else run_at}
+
+@pytest.fixture
+def queue():
+    queue = TaskQueue(workers=2, backoff=0.05)
+    yield queue
+    queue.stop()
+
+def test_failed_tasks_are_retried_with_backoff(queue):
+    attempts = []
+    @queue.task('flaky')
+    def flaky(payload):
+        attempts.append(time.time())
+        if len(attempts) < 3:
+            raise RuntimeError('try again')
+
+    queue.enqueue('flaky', {'id': 1})
+
+    assert wait_for(lambda: queue.metrics()['completed'] == 1)
+    assert len(attempts) == 3
+    # The delay doubles after each failure
+    assert attempts[1] - attempts[0] >= 0.05
+    assert attempts[2] - attempts[1] >= 0.1
+    metrics = queue.metrics()
+    assert metrics['retried'] == 2
+    assert metrics['failed'] == 0
+    assert metrics['depth'] == 0
+
+def test_tasks_are_given_up_after_max_attempts():
+    queue = TaskQueue(workers=1, max_attempts=3, backoff=0.01)
+    calls = []
+    @queue.task('broken')
+    def broken(payload):
+        calls.append(payload)
+        raise RuntimeError('always fails')
+
+    try:
+        queue.enqueue('broken', {'id': 1})
+        assert wait_for(lambda: queue.metrics()['failed'] == 1)
+        time.sleep(0.1)
+        assert len(calls) == 3
+        assert queue.metrics()['depth'] == 0
+    finally:
+        queue.stop()
+
+def test_ready_tasks_of_the_same_name_run_as_one_batch():
+    queue = TaskQueue(workers=1)
+    batches = []
+    @queue.task('reindex', batch=True)
+    def reindex(payloads):
+        batches.append([payload['job_id'] for payload in payloads])
+    @queue.task('email')
+    def email(payload):
+        pass
+
+    # Queue everything before the worker starts so it all becomes ready at once
+    for job_id in range(10):
+        queue.backend.put(make_task('reindex', job_id=job_id))
+        queue.backend.put(make_task('email', job_id=job_id))
+    try:
+        queue.start()
+        assert wait_for(lambda: queue.metrics()['completed'] == 20)
+    finally:
+        queue.stop()
+
+    assert batches == [list(range(10))]
+
+def test_memory_backend_batches_one_name_and_leaves_the_rest():
+    backend = MemoryBackend()
+    now = time.time()
+    backend.put(make_task('a', run_at=now - 2, n=1))
+    backend.put(make_task('b', run_at=now - 1, n=2))
+    backend.put(make_task('a', run_at=now, n=3))
+    backend.put(make_task('a', run_at=now + 60, n=4))
+
+    batch = backend.take(batch_size=10, timeout=0)
+    assert [task['payload']['n'] for task in batch] == [1, 3]
+    assert [task['payload']['n'] for task in backend.take(batch_size=10, timeout=0)] == [2]
+    # The delayed task isn't ready yet
+    assert backend.take(batch_size=10, timeout=0) == []
+    assert backend.depth() == 1
+
+def test_memory_backend_take_wakes_up_on_put():
+    backend = MemoryBackend()
+    threading.Timer(0.05, backend.put, args=(make_task('a'),)).start()
+
+    started = time.time()
+    batch = backend.take(batch_size=10, timeout=2.0)
+
+    assert len(batch) == 1
+    assert time.time() - started < 1.0
+
+def test_sqlite_leases_tasks_to_one_backend(tmp_path):
+    path = str(tmp_path / 'tasks.db')
+    first = SQLiteBackend(path, poll_interval=0.01, lease=0.2)
+    second = SQLiteBackend(path, poll_interval=0.01, lease=0.2)
+    for n in range(3):
+        first.put(make_task('a', n=n))
+
+    batch = first.take(batch_size=10, timeout=0)
+    assert len(batch) == 3
+    # Leased tasks are invisible to other backends, and only their owner may
+    # delete them
+    assert second.take(batch_size=10, timeout=0) == []
+    second.ack(batch)
+    assert first.depth() == 3
+
+    # Once the lease runs out (the owner died mid-task) another backend takes over
+    time.sleep(0.25)
+    taken = second.take(batch_size=10, timeout=0)
+    assert sorted(task['payload']['n'] for task in taken) == [0, 1, 2]
+    second.ack(taken)
+    assert second.depth() == 0
+
+def test_new_queue_resumes_tasks_persisted_by_an_earlier_one(tmp_path):
+    path = str(tmp_path / 'tasks.db')
+    # A queue with no workers only persists what it is given, like a process
+    # that stopped before running its tasks
+    producer = TaskQueue(SQLiteBackend(path), workers=0)
+    producer.task('email')(lambda payload: None)
+    producer.enqueue('email', {'to': 'seeker@example.com'})
+
+    consumer = TaskQueue(SQLiteBackend(path, poll_interval=0.01), workers=1)
+    sent = []
+    consumer.task('email')(sent.append)
+    try:
+        consumer.start()
+        assert wait_for(lambda: sent == [{'to': 'seeker@example.com'}])
+        assert wait_for(lambda: consumer.metrics()['depth'] == 0)
+    finally:
+        consumer.stop()
+
+def test_app_starts_task_workers_when_serving(backend):
+    backend.app.test_client().get('/api/metrics')
+
+    assert backend.task_queue.metrics()['workers'] == backend.task_queue.workers